@@ -1,6 +1,8 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import List
+import asyncio
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional
 
 from langchain_core.messages import (
     SystemMessage,
@@ -9,6 +11,19 @@ from langchain_core.messages import (
     AIMessage  # if you ever need to add an AI message manually
 )
 from main import graph
+from checkpointing import run_graph
+from workflow_state import artifact_store
+from batch_analysis import run_batch
+from data_export import (
+    DATASETS,
+    MEDIA_TYPES,
+    arrow_stream,
+    parquet_bytes,
+    query_table,
+    refresh_datasets,
+    result_store,
+)
+from streaming.market_stream import get_market_stream, filter_message
 
 # Initialize FastAPI app
 app = FastAPI()
@@ -16,9 +31,35 @@ app = FastAPI()
 # Define response model
 class ResponseModel(BaseModel):
     messages: List[str]
+    rankings: List[dict] = []
+    indicators: Dict[str, dict] = {}
+    sentiment: dict = {}
+
+# Limits of a batch request
+MAX_BATCH_SPECS = 20
+MAX_SPEC_TICKERS = 500      # The top-stocks universe is the S&P 500
+MAX_LOOKBACK_DAYS = 10 * 365
+
+
+class AnalysisSpec(BaseModel):
+    name: Optional[str] = None
+    tickers: Optional[List[str]] = Field(None, max_length=MAX_SPEC_TICKERS)  # Custom ticker list
+    watchlist: Optional[str] = None           # Name of a watchlist in the request
+    universe_size: int = Field(10, gt=0, le=MAX_SPEC_TICKERS)  # Top stocks used when no tickers/watchlist
+    lookback_days: int = Field(180, gt=0, le=MAX_LOOKBACK_DAYS)
+    weight_profile: str = "default"           # See WEIGHT_PROFILES in fundamental_analysis
+    weights: Optional[Dict[str, float]] = None  # Custom weights per FUNDAMENTAL_METRICS name, override the profile
+    include_fundamentals: bool = True
+    top_n: int = Field(10, gt=0, le=MAX_SPEC_TICKERS)
+
+
+class BatchRequest(BaseModel):
+    specs: List[AnalysisSpec] = Field(..., min_length=1, max_length=MAX_BATCH_SPECS)
+    watchlists: Dict[str, List[str]] = {}
+
 
 @app.get("/analyze")
-async def analyze_market() -> ResponseModel:
+def analyze_market() -> ResponseModel:
     """
     FastAPI endpoint to process stock market analysis with a fixed message.
     """
@@ -26,12 +67,133 @@ async def analyze_market() -> ResponseModel:
     initial_messages = [HumanMessage(content="Analyze the US stock market and give me the best stocks for today.")]
     initial_state = {"messages": initial_messages}
 
-    # Invoke the workflow
-    final_state = graph.invoke(initial_state)
+    # Invoke the workflow (resumes from checkpoints when available)
+    final_state = run_graph(graph, initial_state)
 
     # Extract messages from final state
     response_messages = [msg.content for msg in final_state["messages"]]
 
-    return ResponseModel(messages=response_messages)
+    return ResponseModel(
+        messages=response_messages,
+        rankings=final_state.get("rankings", []),
+        indicators=final_state.get("indicators", {}),
+        sentiment=final_state.get("sentiment", {}),
+    )
+
+@app.get("/artifacts/{ref}")
+def get_artifact(ref: str):
+    """
+    Full tool payload referenced as `[ref: ...]` in the analysis messages.
+    """
+    text = artifact_store.get_text(ref)
+    if text is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired artifact: {ref}")
+    return Response(text, media_type="application/json")
+
+@app.post("/analyze/batch")
+def analyze_batch(request: BatchRequest):
+    """
+    Run many analysis specs at once. Data for the union of their tickers is
+    fetched and computed once, then ranked per spec.
+    """
+    try:
+        return run_batch([spec.model_dump() for spec in request.specs], request.watchlists)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class RefreshRequest(BaseModel):
+    tickers: Optional[List[str]] = None   # Defaults to the top `universe_size` stocks
+    universe_size: int = 500
+    start_date: str
+    end_date: str
+    include_fundamentals: bool = True
+
+
+@app.post("/data/refresh")
+def refresh_data(request: RefreshRequest):
+    """
+    Recompute the indicator panel, fundamental feature matrix, ranking table and risk weights.
+    """
+    tickers = request.tickers
+    if not tickers:
+        from top_stocks import get_top_stocks
+        tickers = get_top_stocks(request.universe_size)
+    rows = refresh_datasets(tickers, request.start_date, request.end_date, request.include_fundamentals)
+    return {"datasets": rows}
+
+
+@app.get("/data/{dataset}")
+def export_data(
+    dataset: str,
+    format: str = "arrow",
+    columns: Optional[str] = None,
+    tickers: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+):
+    """
+    Serve a computed dataset (indicators, fundamentals, rankings or risk) as an Arrow
+    IPC stream or Parquet. Optional comma separated `columns` and `tickers`, and
+    `start` / `end` dates for the indicator panel.
+    """
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset}")
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    table = result_store.get(dataset)
+    if table is None:
+        raise HTTPException(status_code=404, detail=f"Dataset {dataset} has not been computed yet.")
+
+    # Unfiltered Parquet is served straight from the stored file
+    if format == "parquet" and not (columns or tickers or start or end):
+        return FileResponse(result_store.path(dataset), media_type=MEDIA_TYPES[format], filename=f"{dataset}.parquet")
+
+    split = lambda value: [item.strip() for item in value.split(",") if item.strip()] if value else None
+    try:
+        table = query_table(table, split(columns), split(tickers), start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format == "parquet":
+        return Response(content=parquet_bytes(table), media_type=MEDIA_TYPES[format])
+    return StreamingResponse(arrow_stream(table), media_type=MEDIA_TYPES[format])
+
+
+@app.websocket("/ws/market")
+async def market_updates(websocket: WebSocket):
+    """
+    Push live prices, indicators and rank moves. Sends a full snapshot first, then
+    only changed values. Optional query parameter: symbols=AAPL,MSFT
+    """
+    await websocket.accept()
+    symbols = {s.strip().upper() for s in websocket.query_params.get("symbols", "").split(",") if s.strip()}
+
+    stream = await get_market_stream()
+    if symbols:
+        symbols &= stream.indicators.positions.keys()
+        if not symbols:
+            await websocket.close(code=1008, reason="None of the requested symbols are streamed.")
+            return
+
+    queue = stream.subscribe()
+
+    async def forward():
+        await websocket.send_json(filter_message(stream.snapshot_message(), symbols))
+        while True:
+            message = filter_message(await queue.get(), symbols)
+            if message["updates"] or message["rank_moves"]:
+                await websocket.send_json(message)
+
+    sender = asyncio.create_task(forward())
+    try:
+        # Clients only listen; receiving notices a disconnect even when nothing is sent
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        stream.unsubscribe(queue)
 
 # Run the server using: uvicorn filename:app --reload
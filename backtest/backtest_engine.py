@@ -0,0 +1,290 @@
+import numpy as np
+from technical_tools import compute_indicator_panel
+from price_panel import get_price_panel, panel_dates
+
+# Trading days per year, used to annualize returns and volatility
+PERIODS_PER_YEAR = 252
+
+# ----------------------------------------------------------------------------
+# SIGNALS
+# Every signal is an array of shape (dates, tickers). Higher is better for
+# ranking signals; +1 / 0 / -1 for directional signals.
+# ----------------------------------------------------------------------------
+
+
+def ma_crossover_signal(indicators):
+    """Long when the 50-day MA is above the 200-day MA, short when below."""
+    ma_50, ma_200 = indicators["MA_50"], indicators["MA_200"]
+    signal = np.sign(ma_50 - ma_200)
+    return np.where(np.isnan(signal), 0.0, signal)
+
+
+def rsi_reversion_signal(indicators, lower: float = 30, upper: float = 70):
+    """Long when RSI is oversold, short when overbought."""
+    rsi = indicators["RSI"]
+    return np.where(rsi < lower, 1.0, np.where(rsi > upper, -1.0, 0.0))
+
+
+def macd_signal(indicators):
+    """Long when MACD is above its signal line, short when below."""
+    signal = np.sign(indicators["MACD"] - indicators["Signal_Line"])
+    return np.where(np.isnan(signal), 0.0, signal)
+
+
+def bollinger_signal(indicators, close):
+    """Long below the lower band, short above the upper band."""
+    return np.where(close < indicators["BB_Lower"], 1.0, np.where(close > indicators["BB_Upper"], -1.0, 0.0))
+
+
+TECHNICAL_SIGNALS = {
+    "ma_crossover": lambda indicators, close: ma_crossover_signal(indicators),
+    "rsi_reversion": lambda indicators, close: rsi_reversion_signal(indicators),
+    "macd": lambda indicators, close: macd_signal(indicators),
+    "bollinger": bollinger_signal,
+}
+
+
+def scores_from_ranking(ranking, tickers, n_dates: int):
+    """
+    Broadcast `rank_companies` scores to a (dates, tickers) score array.
+
+    `ranking` is the DataFrame returned by `rank_companies` (Ticker, Final_Score) or a
+    {ticker: score} dict. Tickers without a score get NaN and are never held.
+    Note: fundamental scores are a snapshot, so backtesting them over past dates has
+    look-ahead bias unless the snapshot was taken at the start of the period.
+    """
+    if hasattr(ranking, "to_numpy"):
+        ranking = dict(zip(ranking["Ticker"], ranking["Final_Score"]))
+    row = np.array([ranking.get(ticker, np.nan) for ticker in tickers], dtype=np.float64)
+    return np.broadcast_to(row, (n_dates, len(tickers)))
+
+
+# ----------------------------------------------------------------------------
+# POSITION SIZING
+# ----------------------------------------------------------------------------
+
+
+def top_n_weights(scores, n: int, long_short: bool = False):
+    """
+    Equal-weight the `n` best scored tickers on every date (and short the `n` worst
+    when `long_short` is set). NaN scores are never selected.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    valid = ~np.isnan(scores)
+    n_valid = valid.sum(axis=1, keepdims=True)
+
+    # Rank within each date: 0 = best score, NaNs pushed to the end
+    order = np.argsort(np.where(valid, -scores, np.inf), axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(scores.shape[1])[None, :], axis=1)
+
+    k = np.minimum(n, n_valid)
+    weights = np.where(ranks < k, 1.0, 0.0)
+    if long_short:
+        k = np.minimum(n, n_valid // 2)
+        weights = np.where(ranks < k, 1.0, 0.0)
+        weights -= np.where(valid & (ranks >= n_valid - k), 1.0, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(k > 0, weights / k, 0.0)
+
+
+def signal_weights(signal):
+    """
+    Turn a +1 / 0 / -1 signal into weights with unit gross exposure on every date.
+    """
+    signal = np.nan_to_num(np.asarray(signal, dtype=np.float64))
+    gross = np.abs(signal).sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(gross > 0, signal / gross, 0.0)
+
+
+# ----------------------------------------------------------------------------
+# ENGINE
+# ----------------------------------------------------------------------------
+
+
+def rebalance_mask(dates, rebalance="W"):
+    """
+    Boolean mask of the dates on which the portfolio is rebalanced.
+
+    :param rebalance: "D" (daily), "W" (first bar of each week), "M" (first bar of each
+                      month) or an int N (every N bars).
+    """
+    dates = np.asarray(dates).astype("datetime64[D]")
+    mask = np.zeros(len(dates), dtype=bool)
+    if not len(dates):
+        return mask
+
+    if isinstance(rebalance, int):
+        mask[::rebalance] = True
+        return mask
+    if rebalance == "D":
+        mask[:] = True
+        return mask
+    if rebalance == "W":
+        # 1970-01-01 was a Thursday; shift so that weeks start on Monday
+        periods = (dates.astype(np.int64) + 3) // 7
+    elif rebalance == "M":
+        periods = dates.astype("datetime64[M]").astype(np.int64)
+    else:
+        raise ValueError(f"Unknown rebalance frequency: {rebalance}")
+
+    mask[0] = True
+    mask[1:] = periods[1:] != periods[:-1]
+    return mask
+
+
+def run_backtest(close, target_weights, dates, rebalance="W", cost_bps: float = 5.0, lag: int = 1):
+    """
+    Simulate holding `target_weights` over the price panel, for all tickers and dates at once.
+
+    Weights are traded at the close of each rebalance date and drift with prices in
+    between, so turnover and costs reflect the actual trades needed.
+
+    :param close: closing prices, shape (dates, tickers)
+    :param target_weights: desired weights, shape (dates, tickers); row t may only use
+                           information available at the close of date t
+    :param rebalance: see `rebalance_mask`
+    :param cost_bps: transaction cost in basis points of traded notional
+    :param lag: bars between a signal and its execution (1 = trade on the next close)
+    :return: dict with daily returns, equity curve, turnover, held weights and a summary
+    """
+    close = np.asarray(close, dtype=np.float64)
+    target = np.nan_to_num(np.asarray(target_weights, dtype=np.float64))
+    n_dates, n_tickers = close.shape
+
+    # Execution lag: the weights traded on date t come from the signal at t - lag
+    if lag:
+        target = np.vstack([np.zeros((lag, n_tickers)), target[:-lag]])
+
+    # Tickers without a price on the trade date cannot be bought
+    tradable = ~np.isnan(close)
+    target = np.where(tradable, target, 0.0)
+
+    # Per-ticker simple returns; missing prices contribute a flat return
+    asset_returns = np.zeros_like(close)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        asset_returns[1:] = close[1:] / close[:-1] - 1
+    asset_returns = np.where(np.isfinite(asset_returns), asset_returns, 0.0)
+    growth = np.cumprod(1 + asset_returns, axis=0)
+
+    # Index of the last rebalance strictly before each date: that's the portfolio
+    # earning the return on that date.
+    mask = rebalance_mask(dates, rebalance)
+    last_rebalance = np.maximum.accumulate(np.where(mask, np.arange(n_dates), 0))
+    holding_since = np.zeros(n_dates, dtype=np.int64)
+    holding_since[1:] = last_rebalance[:-1]
+
+    weights = target[holding_since]
+    cash = 1 - weights.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        relative = growth / growth[holding_since]
+    relative = np.where(np.isfinite(relative), relative, 1.0)
+
+    # Portfolio value relative to the last rebalance, today and yesterday
+    value = (weights * relative).sum(axis=1) + cash
+    prev_value = np.ones(n_dates)
+    same_holding = np.zeros(n_dates, dtype=bool)
+    same_holding[1:] = holding_since[1:] == holding_since[:-1]
+    prev_value[1:] = np.where(same_holding[1:], value[:-1], 1.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gross_returns = np.where(prev_value != 0, value / prev_value - 1, 0.0)
+    gross_returns[0] = 0.0
+
+    # Weights just before trading (drifted since the previous rebalance) vs. after
+    with np.errstate(invalid="ignore", divide="ignore"):
+        drifted = weights * relative / value[:, None]
+    drifted = np.where(np.isfinite(drifted), drifted, 0.0)
+    drifted[0] = 0.0
+    turnover = np.where(mask, np.abs(target - drifted).sum(axis=1), 0.0)
+    costs = turnover * cost_bps / 10_000
+    returns = gross_returns - costs
+
+    # Held weights on each date (after any trade at that close)
+    held = np.where(mask[:, None], target, drifted)
+
+    return {
+        "dates": np.asarray(dates),
+        "returns": returns,
+        "equity": np.cumprod(1 + returns),
+        "turnover": turnover,
+        "weights": held,
+        "summary": summarize(returns, turnover, weights, asset_returns),
+    }
+
+
+def max_drawdown(equity):
+    """Largest peak-to-trough decline of an equity curve, as a negative fraction."""
+    equity = np.asarray(equity, dtype=np.float64)
+    if not len(equity):
+        return 0.0
+    peaks = np.maximum.accumulate(np.maximum(equity, 1.0))
+    return float((equity / peaks - 1).min())
+
+
+def summarize(returns, turnover, weights, asset_returns):
+    """
+    Headline statistics of a backtest.
+
+    Hit rate is the share of held (ticker, date) positions whose return had the same
+    sign as the position.
+    """
+    equity = np.cumprod(1 + returns)
+    n_periods = max(len(returns) - 1, 1)
+    years = n_periods / PERIODS_PER_YEAR
+    volatility = float(returns[1:].std() * np.sqrt(PERIODS_PER_YEAR)) if len(returns) > 1 else 0.0
+    annual_return = float(equity[-1] ** (1 / years) - 1) if len(equity) and equity[-1] > 0 else -1.0
+
+    positions = weights != 0
+    n_positions = positions.sum()
+    hits = (np.sign(weights) * asset_returns > 0) & positions
+
+    return {
+        "total_return": float(equity[-1] - 1) if len(equity) else 0.0,
+        "annual_return": annual_return,
+        "annual_volatility": volatility,
+        "sharpe": annual_return / volatility if volatility else 0.0,
+        "max_drawdown": max_drawdown(equity),
+        "annual_turnover": float(turnover.sum() / years),
+        "hit_rate": float(hits.sum() / n_positions) if n_positions else 0.0,
+    }
+
+
+def backtest_technical_signal(panel, signal_name: str, rebalance="W", cost_bps: float = 5.0, lag: int = 1, indicators=None):
+    """
+    Backtest one of the `TECHNICAL_SIGNALS` over a price panel.
+    Pass precomputed `indicators` to reuse them across several signals.
+    """
+    close = panel["close"]
+    if indicators is None:
+        indicators = compute_indicator_panel(close, panel["high"], panel["low"])
+    signal = TECHNICAL_SIGNALS[signal_name](indicators, np.asarray(close, dtype=np.float64))
+    return run_backtest(close, signal_weights(signal), panel_dates(panel), rebalance, cost_bps, lag)
+
+
+def backtest_ranking(panel, scores, top_n: int = 10, long_short: bool = False, rebalance="M", cost_bps: float = 5.0, lag: int = 1):
+    """
+    Backtest holding the `top_n` best scored tickers, e.g. `rank_companies` scores
+    broadcast with `scores_from_ranking`.
+    """
+    weights = top_n_weights(scores, top_n, long_short)
+    return run_backtest(panel["close"], weights, panel_dates(panel), rebalance, cost_bps, lag)
+
+
+# ----------------------------------------------------------------------------
+# DEMO USAGE (run from the repository root: python -m backtest.backtest_engine)
+# ----------------------------------------------------------------------------
+if __name__ == "__main__":
+    from top_stocks import get_top_stocks
+
+    tickers = get_top_stocks(500)
+    panel = get_price_panel(tickers, "2018-01-01", "2024-12-31")
+
+    indicators = compute_indicator_panel(panel["close"], panel["high"], panel["low"])
+
+    for name in TECHNICAL_SIGNALS:
+        result = backtest_technical_signal(panel, name, indicators=indicators)
+        print(f"=== {name} ===")
+        for key, value in result["summary"].items():
+            print(f" {key}: {value:.4f}")
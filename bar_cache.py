@@ -0,0 +1,145 @@
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+
+# Corporate action columns returned by yfinance histories, kept as float64 when present
+ACTION_COLUMNS = ["Dividends", "Stock Splits", "Capital Gains"]
+
+
+def bars_from_frame(data: pd.DataFrame):
+    """
+    Convert a yfinance history frame into compact contiguous arrays:
+    int64 epoch-second index, float32 OHLC, int64 volume and float64 dividends,
+    stock splits and capital gains (only the action columns present in `data`).
+    """
+    actions = [column for column in ACTION_COLUMNS if column in data.columns]
+    data = data.reindex(columns=PRICE_COLUMNS + ["Volume"] + actions)
+    index = pd.DatetimeIndex(data.index)
+    bars = {
+        "index": np.ascontiguousarray(index.values.astype("datetime64[s]").astype(np.int64)),
+        "tz": str(index.tz) if index.tz is not None else None,
+        "index_name": index.name or "Date",
+        "columns": PRICE_COLUMNS + ["Volume"] + actions,
+    }
+    for column in PRICE_COLUMNS:
+        bars[column] = np.ascontiguousarray(data[column].to_numpy(dtype=np.float32))
+    bars["Volume"] = np.ascontiguousarray(data["Volume"].fillna(0).to_numpy(dtype=np.int64))
+    for column in actions:
+        bars[column] = np.ascontiguousarray(data[column].to_numpy(dtype=np.float64))
+    return bars
+
+
+def frame_from_bars(bars):
+    """
+    Build a fresh DataFrame from cached bars. The frame owns its data, so callers
+    can add columns without touching the cache.
+    """
+    index = pd.to_datetime(bars["index"], unit="s", utc=True)
+    index = index.tz_convert(bars["tz"]) if bars["tz"] else index.tz_localize(None)
+    index.name = bars["index_name"]
+    return pd.DataFrame(
+        {column: np.array(bars[column]) for column in bars["columns"]},
+        index=index,
+    )
+
+
+def bars_nbytes(bars):
+    """Memory used by the arrays of a bars entry."""
+    return sum(value.nbytes for value in bars.values() if isinstance(value, np.ndarray))
+
+
+class BarCache:
+    """
+    Memory-bounded cache of OHLCV bars.
+
+    Entries expire after `ttl` seconds and the least recently used entries are
+    evicted whenever the total size exceeds `max_bytes`. Cached arrays are
+    read-only, so callers can never mutate what other callers will receive.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, ttl: float = 3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.nbytes = 0
+        self._entries = OrderedDict()  # key -> (stored_at, bars, nbytes)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, max_age: float = None):
+        """
+        Return the cached bars for `key`, or None if missing or older than
+        `max_age` seconds (defaults to the cache TTL).
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, bars, _ = entry
+            if time.time() - stored_at >= max_age:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return bars
+
+    def put(self, key, bars):
+        """
+        Store bars under `key` and return the read-only cached version.
+        Entries larger than the whole budget are returned but not cached.
+        """
+        bars = {
+            name: self._freeze(value) if isinstance(value, np.ndarray) else value
+            for name, value in bars.items()
+        }
+        size = bars_nbytes(bars)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return bars
+
+            self._evict_expired()
+            while self._entries and self.nbytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+            self._entries[key] = (time.time(), bars, size)
+            self.nbytes += size
+        return bars
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def evict_expired(self):
+        """Drop every entry older than the TTL."""
+        with self._lock:
+            self._evict_expired()
+
+    def _evict_expired(self):
+        now = time.time()
+        expired = [key for key, (stored_at, _, _) in self._entries.items() if now - stored_at >= self.ttl]
+        for key in expired:
+            self._remove(key)
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self.nbytes -= size
+
+    @staticmethod
+    def _freeze(array):
+        array = np.ascontiguousarray(array)
+        if array.flags.writeable:
+            array = array.copy() if array.base is not None else array
+            array.flags.writeable = False
+        return array
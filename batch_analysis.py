@@ -0,0 +1,176 @@
+import warnings
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from price_panel import build_price_panel, panel_dates
+from technical_tools import compute_indicator_panel
+from universe_scan import indicator_snapshot, fetch_fundamental_features
+from top_stocks import get_top_stocks
+
+# Extra history fetched before the longest lookback so the 200-day MA is defined
+WARMUP_DAYS = 300
+
+# Threads used to fetch fundamental data (network bound)
+FUNDAMENTAL_FETCH_THREADS = 8
+
+DEFAULT_SPEC = {
+    "name": None,
+    "tickers": None,
+    "watchlist": None,
+    "universe_size": 10,
+    "lookback_days": 180,
+    "weight_profile": "default",
+    "weights": None,
+    "include_fundamentals": True,
+    "top_n": 10,
+}
+
+
+def resolve_specs(specs, watchlists=None):
+    """
+    Fill in defaults and the ticker list of every spec: explicit `tickers`, else the
+    named `watchlist`, else the top `universe_size` stocks (fetched once for all specs).
+    """
+    watchlists = watchlists or {}
+    specs = [{**DEFAULT_SPEC, **spec} for spec in specs]
+
+    universe_size = max([spec["universe_size"] for spec in specs if not spec["tickers"] and not spec["watchlist"]] or [0])
+    universe = get_top_stocks(universe_size) if universe_size else []
+
+    for i, spec in enumerate(specs):
+        spec["name"] = spec["name"] or f"spec_{i + 1}"
+        if spec["tickers"]:
+            tickers = spec["tickers"]
+        elif spec["watchlist"]:
+            if spec["watchlist"] not in watchlists:
+                raise ValueError(f"Unknown watchlist: {spec['watchlist']}")
+            tickers = watchlists[spec["watchlist"]]
+        else:
+            tickers = universe[:spec["universe_size"]]
+        spec["tickers"] = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        if spec["include_fundamentals"]:
+            _spec_weights(spec)  # Fail on unknown profiles before fetching anything
+    return specs
+
+
+def _spec_weights(spec):
+    from fundamental.fundamental_analysis import FUNDAMENTAL_METRICS, WEIGHT_PROFILES
+
+    if spec["weights"]:
+        unknown = [metric for metric in spec["weights"] if metric not in FUNDAMENTAL_METRICS]
+        if unknown:
+            raise ValueError(
+                f"Unknown weight metrics: {', '.join(unknown)}. Available metrics: {', '.join(FUNDAMENTAL_METRICS)}"
+            )
+        return spec["weights"]
+    if spec["weight_profile"] not in WEIGHT_PROFILES:
+        raise ValueError(f"Unknown weight profile: {spec['weight_profile']}")
+    return WEIGHT_PROFILES[spec["weight_profile"]]
+
+
+def _lookback_stats(close, dates, lookback_days: int, end: date):
+    """Return and annualized volatility of every ticker over the lookback window."""
+    cutoff = np.datetime64(end - timedelta(days=lookback_days))
+    start = min(int(np.searchsorted(dates.astype("datetime64[D]"), cutoff)), max(len(close) - 1, 0))
+    window = close[start:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        first = pd.DataFrame(window).bfill().to_numpy()[0]
+        total_return = window[-1] / first - 1
+        daily = np.diff(np.log(window), axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # Tickers without enough bars
+        volatility = np.nanstd(daily, axis=0, ddof=1) * np.sqrt(252)
+    return total_return, volatility
+
+
+def _records(df):
+    """DataFrame rows as JSON-friendly dicts (NaN -> None)."""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def run_batch(specs, watchlists=None, end_date: date = None):
+    """
+    Run many analysis specs with one shared data pass.
+
+    The union of all tickers is downloaded once over the longest lookback, the
+    indicators are computed once on that panel and fundamental data is fetched
+    once per ticker. Each spec then only slices the shared results, scores its own
+    tickers with its weight profile and ranks them.
+
+    :param specs: list of dicts, see DEFAULT_SPEC for the fields
+    :param watchlists: {name: [tickers]} referenced by specs
+    :return: {"results": [...], "stats": {...}}
+    """
+    from fundamental.fundamental_analysis import score_companies
+
+    specs = resolve_specs(specs, watchlists)
+    end = end_date or date.today()
+    tickers = list(dict.fromkeys(ticker for spec in specs for ticker in spec["tickers"]))
+    max_lookback = max(spec["lookback_days"] for spec in specs)
+    start = end - timedelta(days=max_lookback + WARMUP_DAYS)
+
+    # 1) One price download and one indicator pass for the union of all tickers
+    print(f"📥 Batch of {len(specs)} specs: fetching {len(tickers)} unique tickers once.")
+    panel = build_price_panel(tickers, start.isoformat(), (end + timedelta(days=1)).isoformat())
+    close = np.asarray(panel["close"], dtype=np.float64)
+    dates = panel_dates(panel)
+    indicators = compute_indicator_panel(close, panel["high"], panel["low"])
+    snapshot = indicator_snapshot(tickers, close, indicators).set_index("Ticker")
+
+    lookback_stats = {
+        lookback: _lookback_stats(close, dates, lookback, end)
+        for lookback in {spec["lookback_days"] for spec in specs}
+    }
+
+    # 2) Fundamental data once per ticker, only for tickers that need it
+    fundamental_tickers = list(dict.fromkeys(
+        ticker for spec in specs if spec["include_fundamentals"] for ticker in spec["tickers"]
+    ))
+    fundamentals = pd.DataFrame(columns=["Ticker"])
+    if fundamental_tickers:
+        chunks = [fundamental_tickers[i::FUNDAMENTAL_FETCH_THREADS] for i in range(FUNDAMENTAL_FETCH_THREADS)]
+        with ThreadPoolExecutor(max_workers=FUNDAMENTAL_FETCH_THREADS) as pool:
+            fundamentals = pd.concat(pool.map(fetch_fundamental_features, [c for c in chunks if c]), ignore_index=True)
+    fundamentals = fundamentals.set_index("Ticker")
+
+    # 3) Fan the shared results out to every spec
+    positions = {ticker: i for i, ticker in enumerate(tickers)}
+    results = []
+    for spec in specs:
+        rows = [positions[ticker] for ticker in spec["tickers"]]
+        table = snapshot.loc[spec["tickers"]].reset_index()
+        total_return, volatility = lookback_stats[spec["lookback_days"]]
+        table.insert(2, "Return", total_return[rows])
+        table.insert(3, "Volatility", volatility[rows])
+        sort_by = ["Technical_Score"]
+
+        if spec["include_fundamentals"]:
+            weights = _spec_weights(spec)
+            features = fundamentals.reindex(spec["tickers"]).reset_index()
+            features = features[["Ticker"] + [key for key in weights if key in features.columns]]
+            scored = score_companies(features, weights)
+            table = table.merge(scored[["Ticker", "Final_Score"]], on="Ticker", how="left")
+            sort_by = ["Final_Score", "Technical_Score"]
+
+        table = table.sort_values(by=sort_by, ascending=False, ignore_index=True).head(spec["top_n"])
+        results.append({
+            "name": spec["name"],
+            "tickers": spec["tickers"],
+            "lookback_days": spec["lookback_days"],
+            "weight_profile": None if spec["weights"] else spec["weight_profile"],
+            "ranking": _records(table),
+        })
+
+    requested = sum(len(spec["tickers"]) for spec in specs)
+    return {
+        "results": results,
+        "stats": {
+            "specs": len(specs),
+            "requested_tickers": requested,
+            "unique_tickers": len(tickers),
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+        },
+    }
@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# Local SQLite file holding the graph checkpoints
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "checkpoints.sqlite")
+
+# Checkpoints of runs older than this are garbage-collected
+CHECKPOINT_MAX_AGE = int(os.getenv("CHECKPOINT_MAX_AGE_SECONDS", 2 * 24 * 3600))
+
+# Tool payloads referenced from checkpointed state (see workflow_state.ArtifactStore)
+ARTIFACTS_TABLE = (
+    "CREATE TABLE IF NOT EXISTS artifacts ("
+    "ref TEXT PRIMARY KEY, run_key TEXT, created_at REAL NOT NULL, payload TEXT NOT NULL)"
+)
+
+
+# One lock per run key, so concurrent callers of the same run wait for each other
+_run_locks = {}
+_run_locks_guard = threading.Lock()
+
+
+def _run_lock(run_key: str):
+    with _run_locks_guard:
+        return _run_locks.setdefault(run_key, threading.Lock())
+
+
+def get_checkpointer(path: str = CHECKPOINT_DB):
+    """
+    SQLite checkpointer for the compiled graph, plus a `runs` table used to
+    garbage-collect old checkpoints and the `artifacts` table of tool payloads.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS runs (run_key TEXT PRIMARY KEY, created_at REAL NOT NULL)"
+    )
+    conn.execute(ARTIFACTS_TABLE)
+    conn.commit()
+    checkpointer = SqliteSaver(conn)
+    checkpointer.setup()
+    return checkpointer
+
+
+def make_run_key(initial_state, data_version: str = None):
+    """
+    Run key derived from the workflow inputs and the version of the data they
+    read. Market data changes daily, so by default the data version is the
+    current UTC date (override with DATA_VERSION).
+    """
+    data_version = data_version or os.getenv("DATA_VERSION") or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    inputs = [message.content for message in initial_state.get("messages", [])]
+    payload = json.dumps({"inputs": inputs, "data_version": data_version}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def collect_garbage(checkpointer, max_age: float = CHECKPOINT_MAX_AGE):
+    """Delete the checkpoints and tool payloads of runs started more than `max_age` seconds ago."""
+    cutoff = time.time() - max_age
+    with checkpointer.lock:
+        expired = [row[0] for row in checkpointer.conn.execute(
+            "SELECT run_key FROM runs WHERE created_at < ?", (cutoff,)
+        )]
+    for run_key in expired:
+        checkpointer.delete_thread(run_key)
+        with checkpointer.lock:
+            checkpointer.conn.execute("DELETE FROM runs WHERE run_key = ?", (run_key,))
+            checkpointer.conn.commit()
+        with _run_locks_guard:
+            _run_locks.pop(run_key, None)
+    with checkpointer.lock:
+        checkpointer.conn.execute("DELETE FROM artifacts WHERE created_at < ?", (cutoff,))
+        checkpointer.conn.commit()
+    if expired:
+        logging.info(f"Deleted checkpoints of {len(expired)} old runs.")
+
+
+def run_graph(graph, initial_state, run_key: str = None):
+    """
+    Invoke a graph compiled with `get_checkpointer`, resuming from checkpoints:
+    - a run that already completed returns its stored final state,
+    - a run that failed part-way resumes after the last completed nodes,
+    - otherwise the graph starts from `initial_state`.
+    A second caller of the same run waits for the first one, then reuses or
+    resumes its run.
+    """
+    checkpointer = graph.checkpointer
+    run_key = run_key or make_run_key(initial_state)
+
+    collect_garbage(checkpointer)
+
+    with _run_lock(run_key):
+        return _invoke_run(graph, initial_state, run_key)
+
+
+def _invoke_run(graph, initial_state, run_key: str):
+    checkpointer = graph.checkpointer
+    config = {"configurable": {"thread_id": run_key}}
+    snapshot = graph.get_state(config)
+    if snapshot.values and not snapshot.next:
+        print(f"♻️ Reusing completed run {run_key}.")
+        return snapshot.values
+    if snapshot.next:
+        print(f"♻️ Resuming run {run_key} at {', '.join(snapshot.next)}.")
+        return graph.invoke(None, config)
+
+    with checkpointer.lock:
+        checkpointer.conn.execute(
+            "INSERT OR REPLACE INTO runs (run_key, created_at) VALUES (?, ?)", (run_key, time.time())
+        )
+        checkpointer.conn.commit()
+    return graph.invoke(initial_state, config)
@@ -0,0 +1,214 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from price_panel import PANEL_DIR, get_price_panel
+from technical_tools import compute_indicator_panel
+
+# Computed datasets are persisted here as Parquet and memory-mapped on load
+EXPORT_DIR = os.path.join(PANEL_DIR, "exports")
+
+DATASETS = ["indicators", "fundamentals", "rankings", "risk"]
+
+# Rows per record batch in Arrow IPC streams
+STREAM_BATCH_ROWS = 64 * 1024
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+# ----------------------------------------------------------------------------
+# BUILDING ARROW TABLES
+# ----------------------------------------------------------------------------
+
+
+def indicator_table(panel, indicators):
+    """
+    Long-format Arrow table (Date, Ticker, Close, Volume, indicators...) built
+    straight from the (dates x tickers) arrays. Row-major arrays are flattened
+    without copying and the tickers are dictionary-encoded.
+    """
+    n_dates, n_tickers = panel["close"].shape
+    dates = np.repeat(panel["index"], n_tickers).astype("datetime64[s]")
+    ticker_codes = np.tile(np.arange(n_tickers, dtype=np.int32), n_dates)
+
+    columns = {
+        "Date": pa.array(dates),
+        "Ticker": pa.DictionaryArray.from_arrays(ticker_codes, pa.array(panel["tickers"])),
+        "Close": pa.array(np.ascontiguousarray(panel["close"]).ravel()),
+        "Volume": pa.array(np.ascontiguousarray(panel["volume"]).ravel()),
+    }
+    for name, values in indicators.items():
+        columns[name] = pa.array(np.ascontiguousarray(values).ravel())
+    return pa.table(columns)
+
+
+def frame_table(df: pd.DataFrame):
+    """Arrow table of a result DataFrame, without the pandas index."""
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+# ----------------------------------------------------------------------------
+# RESULT STORE
+# ----------------------------------------------------------------------------
+
+
+class ResultStore:
+    """
+    Latest computed datasets as Arrow tables, kept in memory and persisted to
+    Parquet. After a restart, tables are memory-mapped from disk on first use.
+    """
+
+    def __init__(self, directory: str = EXPORT_DIR):
+        self.directory = directory
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def path(self, name: str):
+        return os.path.join(self.directory, f"{name}.parquet")
+
+    def publish(self, name: str, table: pa.Table):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.path(name) + ".tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.path(name))
+        with self._lock:
+            self._tables[name] = table
+
+    def discard(self, name: str):
+        """Drop a dataset that is no longer current, in memory and on disk."""
+        with self._lock:
+            self._tables.pop(name, None)
+            if os.path.exists(self.path(name)):
+                os.remove(self.path(name))
+
+    def get(self, name: str):
+        """Return the dataset, or None if it was never computed."""
+        with self._lock:
+            if name not in self._tables and os.path.exists(self.path(name)):
+                self._tables[name] = pq.read_table(self.path(name), memory_map=True)
+            return self._tables.get(name)
+
+
+result_store = ResultStore()
+
+
+def refresh_datasets(tickers, start_date: str, end_date: str, include_fundamentals: bool = True):
+    """
+    Compute and publish the indicator panel, fundamental feature matrix, ranking
+    table and (with fundamentals) the risk-aware weights of the ranked tickers.
+    Datasets that this refresh does not recompute are discarded, so no dataset of
+    an earlier universe or date range is served as current.
+    """
+    from universe_scan import scan_universe
+    from risk.risk_analytics import risk_report
+
+    panel = get_price_panel(tickers, start_date, end_date)
+    indicators = compute_indicator_panel(panel["close"], panel["high"], panel["low"])
+
+    # Build every table first, so a failure never leaves a mix of old and new datasets
+    tables = {"indicators": indicator_table(panel, indicators)}
+
+    ranked = scan_universe(panel, include_fundamentals=include_fundamentals, indicators=indicators)
+    ranked.insert(0, "Rank", np.arange(1, len(ranked) + 1))
+    technical_columns = ["Close", "Technical_Score"] + list(indicators)
+    score_columns = ["Rank", "Ticker", "Close", "Technical_Score"] + (["Final_Score"] if include_fundamentals else [])
+    tables["rankings"] = frame_table(ranked[score_columns])
+
+    if include_fundamentals:
+        feature_columns = [c for c in ranked.columns if c not in technical_columns + ["Rank", "Ticker", "Final_Score"]]
+        # Raw fundamental values are untyped; coerce them like `score_companies` does
+        features = ranked[feature_columns].apply(pd.to_numeric, errors="coerce")
+        features.insert(0, "Ticker", ranked["Ticker"])
+        tables["fundamentals"] = frame_table(features)
+
+        report, _ = risk_report(panel, ranked[["Ticker", "Final_Score"]].dropna())
+        tables["risk"] = frame_table(report)
+
+    for name in DATASETS:
+        if name in tables:
+            result_store.publish(name, tables[name])
+        else:
+            result_store.discard(name)
+
+    return {name: table.num_rows for name, table in tables.items()}
+
+
+# ----------------------------------------------------------------------------
+# QUERYING AND SERIALIZATION
+# ----------------------------------------------------------------------------
+
+
+def query_table(table: pa.Table, columns=None, tickers=None, start: str = None, end: str = None):
+    """
+    Filter and project an Arrow table with Arrow compute kernels.
+
+    :param columns: columns to keep ("Ticker" and "Date" are always kept when present)
+    :param tickers: only rows for these tickers
+    :param start, end: inclusive date bounds (tables with a "Date" column only)
+    """
+    mask = None
+    if tickers:
+        ticker_column = table["Ticker"]
+        if pa.types.is_dictionary(ticker_column.type):
+            ticker_column = ticker_column.cast(pa.string())
+        mask = pc.is_in(ticker_column, value_set=pa.array(list(tickers)))
+    if "Date" in table.column_names:
+        date_type = table["Date"].type
+        for bound, compare in ((start, pc.greater_equal), (end, pc.less_equal)):
+            if bound:
+                condition = compare(table["Date"], pa.scalar(pd.Timestamp(bound).to_pydatetime()).cast(date_type))
+                mask = condition if mask is None else pc.and_(mask, condition)
+    if mask is not None:
+        table = table.filter(mask)
+
+    if columns:
+        unknown = [column for column in columns if column not in table.column_names]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        keys = [key for key in ("Date", "Ticker") if key in table.column_names and key not in columns]
+        table = table.select(keys + list(columns))
+    return table
+
+
+class _ChunkSink:
+    """File-like sink collecting the bytes written by the IPC writer."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        chunk, self.chunks = b"".join(self.chunks), []
+        return chunk
+
+
+def arrow_stream(table: pa.Table, batch_rows: int = STREAM_BATCH_ROWS):
+    """Yield an Arrow IPC stream of `table` one record batch at a time."""
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+            yield sink.take()
+    yield sink.take()
+
+
+def parquet_bytes(table: pa.Table):
+    """Serialize a table to Parquet in memory."""
+    buffer = pa.BufferOutputStream()
+    pq.write_table(table, buffer)
+    return buffer.getvalue().to_pybytes()
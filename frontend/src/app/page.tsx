@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { Button } from "./components/ui/button";
 import {
   Table,
@@ -49,48 +49,99 @@ const MOCK_STOCKS: StockData[] = [
   { id: 5, name: "Tesla Inc.", symbol: "TSLA", price: 220.15, change: 2.34 },
 ];
 
+// Live market updates pushed by the backend (see /ws/market in app.py)
+const MARKET_WS_URL = "ws://localhost:5000/ws/market"; // Adjust URL as needed
+
+interface StreamUpdate {
+  symbol: string;
+  price?: number | null;
+  change?: number | null;
+  rank?: number;
+}
+
+interface StreamMessage {
+  type: "snapshot" | "update";
+  updates: StreamUpdate[];
+  rank_moves: { symbol: string; from: number | null; to: number }[];
+}
+
+interface LiveStock {
+  symbol: string;
+  price: number;
+  change: number;
+  rank: number;
+}
+
 export default function StockTracker() {
   const [stocks, setStocks] = useState<StockData[]>([]);
   const [loading, setLoading] = useState(false);
+  const socketRef = useRef<WebSocket | null>(null);
+  const liveRef = useRef<Map<string, LiveStock>>(new Map());
 
-  // Function to fetch stock data from the backend
-  const fetchStockData = async () => {
-    setLoading(true);
+  // Apply a snapshot or incremental update to the live table
+  const applyMessage = (message: StreamMessage) => {
+    const live = liveRef.current;
+    if (message.type === "snapshot") {
+      live.clear();
+    }
 
-    try {
-      const response = await fetch("http://localhost:5000/analyze"); // Adjust URL as needed
-      if (!response.ok) {
-        throw new Error("Failed to fetch stock data");
+    for (const update of message.updates) {
+      const current = live.get(update.symbol) ?? {
+        symbol: update.symbol,
+        price: 0,
+        change: 0,
+        rank: Number.MAX_SAFE_INTEGER,
+      };
+      live.set(update.symbol, {
+        ...current,
+        price: update.price ?? current.price,
+        change: update.change ?? current.change,
+        rank: update.rank ?? current.rank,
+      });
+    }
+    for (const move of message.rank_moves) {
+      const current = live.get(move.symbol);
+      if (current) {
+        live.set(move.symbol, { ...current, rank: move.to });
       }
+    }
 
-      const data = await response.json();
+    const top = Array.from(live.values())
+      .sort((a, b) => a.rank - b.rank)
+      .slice(0, 5)
+      .map((stock, index) => ({
+        id: index + 1,
+        name: stock.symbol,
+        symbol: stock.symbol,
+        price: stock.price,
+        change: stock.change,
+      }));
+    setStocks(top);
+    setLoading(false);
+  };
 
-      // Transform API response to match UI format
-      const formattedStocks: StockData[] = data.map(
-        (stock: any, index: number) => ({
-          id: index + 1,
-          name: stock.name || stock.ticker, // Use name if available, otherwise ticker
-          symbol: stock.ticker,
-          price: stock.price || 0,
-          change: stock.change || 0,
-        })
-      );
+  // Subscribe to the market stream instead of polling /analyze
+  const connect = () => {
+    socketRef.current?.close();
+    setLoading(true);
 
-      setStocks(formattedStocks);
-    } catch (error) {
+    const socket = new WebSocket(MARKET_WS_URL);
+    socket.onmessage = (event) => applyMessage(JSON.parse(event.data));
+    socket.onerror = (error) => {
       console.error(
-        "Error fetching stock data, using mock data instead:",
+        "Error connecting to market stream, using mock data instead:",
         error
       );
-      setStocks(MOCK_STOCKS); // Fallback to mock data if API call fails
-    }
-
-    setLoading(false);
+      setStocks(MOCK_STOCKS); // Fallback to mock data if the stream fails
+      setLoading(false);
+    };
+    socketRef.current = socket;
   };
 
-  // Fetch data on initial load
+  // Connect on initial load and close the socket on unmount
   useEffect(() => {
-    fetchStockData();
+    connect();
+    return () => socketRef.current?.close();
   }, []);
 
   return (
@@ -101,7 +152,7 @@ export default function StockTracker() {
             Top 5 Stock Companies
           </CardTitle>
           <Button
-            onClick={fetchStockData}
+            onClick={connect}
             disabled={loading}
             className="ml-auto"
           >
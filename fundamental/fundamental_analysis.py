@@ -3,6 +3,15 @@ import pandas as pd
 from fundamental.fundamental_tools import get_fundamental_analysis
 from fundamental.weight import generate_weight_metrics
 
+# Metrics returned by `get_fundamental_analysis` that weights can refer to
+FUNDAMENTAL_METRICS = [
+    "EPS", "PE_Ratio", "PB_Ratio", "PEG_Ratio",
+    "Total_Revenue", "Revenue_Growth", "EPS_Growth_YoY",
+    "Net_Profit_Margin", "Operating_Margin", "ROE", "ROA",
+    "Total_Assets", "Total_Liabilities", "Debt_to_Equity",
+    "Operating_Cash_Flow", "Free_Cash_Flow", "Dividend_Yield", "Payout_Ratio",
+]
+
 # Generate dynamic weights using LLM
 WEIGHTS = generate_weight_metrics()
 
@@ -27,6 +36,36 @@ if not WEIGHTS:
         "Payout_Ratio": -0.05  # Lower is better
     }
 
+# Named weight profiles for batch analysis; "default" uses the weights above
+WEIGHT_PROFILES = {
+    "default": WEIGHTS,
+    "value": {
+        "PE_Ratio": -0.20,
+        "PB_Ratio": -0.20,
+        "PEG_Ratio": -0.10,
+        "Free_Cash_Flow": 0.15,
+        "Debt_to_Equity": -0.10,
+        "ROE": 0.10,
+        "Dividend_Yield": 0.10,
+    },
+    "growth": {
+        "Revenue_Growth": 0.30,
+        "EPS_Growth_YoY": 0.30,
+        "PEG_Ratio": -0.10,
+        "Operating_Margin": 0.10,
+        "ROE": 0.10,
+        "Total_Revenue": 0.05,
+    },
+    "income": {
+        "Dividend_Yield": 0.35,
+        "Payout_Ratio": -0.15,
+        "Free_Cash_Flow": 0.15,
+        "Operating_Cash_Flow": 0.10,
+        "Debt_to_Equity": -0.15,
+        "Net_Profit_Margin": 0.10,
+    },
+}
+
 
 def normalize(value, min_val, max_val):
     """Normalize a value to the range [0, 1] using Min-Max Scaling."""
@@ -35,52 +74,61 @@ def normalize(value, min_val, max_val):
     return (value - min_val) / (max_val - min_val)
 
 
-def rank_companies(ticker_list):
+def score_companies(company_data, weights=None):
     """
-    Fetch fundamental data for multiple companies, calculate weighted scores, and rank them.
-    :param ticker_list: List of company tickers to evaluate.
-    :return: DataFrame with ranked companies.
+    Normalize fundamental metrics and calculate weighted scores.
+    :param company_data: List of fundamental data dicts (with "Ticker") or a DataFrame.
+    :param weights: Metric weights, defaults to WEIGHTS.
+    :return: DataFrame with all metrics and "Final_Score", sorted best first.
     """
-    company_scores = []
-    # return
-
-    # Fetch fundamental data for all companies
-    company_data = []
-    for ticker in ticker_list:
-        data = get_fundamental_analysis.invoke(ticker)
-        if data:
-            data["Ticker"] = ticker
-            company_data.append(data)
+    weights = weights or WEIGHTS
 
     # Convert to DataFrame
     df = pd.DataFrame(company_data)
 
     # Ensure all required columns exist
-    for key in WEIGHTS.keys():
+    for key in weights.keys():
         if key not in df.columns:
             df[key] = None  # Fill missing columns
 
     # ✅ FIX: Fill missing values and manually convert only numeric columns
-    df.fillna(0, inplace=True)
+    df = df.fillna(0)
 
     # Convert only numeric columns to float, keeping "Ticker" as string
     numeric_cols = [col for col in df.columns if col not in ["Ticker"]]
     df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
 
-    # Normalize each metric
-    for metric in WEIGHTS.keys():
-        min_val, max_val = df[metric].min(), df[metric].max()
-        df[metric] = df[metric].apply(lambda x: normalize(x, min_val, max_val))
+    # Normalize each metric (column-wise Min-Max Scaling, 0.5 when all values are equal)
+    metrics = list(weights.keys())
+    min_vals, max_vals = df[metrics].min(), df[metrics].max()
+    spread = (max_vals - min_vals).replace(0, np.nan)
+    df[metrics] = ((df[metrics] - min_vals) / spread).fillna(0.5)
 
     # Calculate weighted scores
-    df["Final_Score"] = df[numeric_cols].mul(pd.Series(WEIGHTS)).sum(axis=1)
+    df["Final_Score"] = df[numeric_cols].mul(pd.Series(weights)).sum(axis=1)
 
     # Rank companies
-    df.sort_values(by="Final_Score", ascending=False, inplace=True)
+    return df.sort_values(by="Final_Score", ascending=False)
+
+
+def rank_companies(ticker_list):
+    """
+    Fetch fundamental data for multiple companies, calculate weighted scores, and rank them.
+    :param ticker_list: List of company tickers to evaluate.
+    :return: DataFrame with ranked companies.
+    """
+    # Fetch fundamental data for all companies
+    company_data = []
+    for ticker in ticker_list:
+        data = get_fundamental_analysis.invoke(ticker)
+        if data:
+            data["Ticker"] = ticker
+            company_data.append(data)
+
+    df = score_companies(company_data)
 
     # Display the top 5 companies
     print("📊 Top 5 Ranked Companies:")
     print(df[["Ticker", "Final_Score"]].head(10))
 
     return df[["Ticker", "Final_Score"]].head(10)
-
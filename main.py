@@ -2,7 +2,7 @@ from typing import Literal
 from dotenv import load_dotenv
 
 # LangGraph & LLM
-from langgraph.graph import StateGraph, START, END, MessagesState
+from langgraph.graph import StateGraph, START, END
 from langchain_groq import ChatGroq
 from langsmith import trace
 # Messages
@@ -12,6 +12,7 @@ from langchain_core.messages import (
     ToolMessage,
     AIMessage  # if you ever need to add an AI message manually
 )
+from langchain_core.runnables import RunnableConfig
 
 # Example Tools
 from technical_tools import (
@@ -22,6 +23,14 @@ from technical_tools import (
 from fundamental.fundamental_analysis import rank_companies
 from top_stocks import get_top_stocks
 from sentiment_analysis.sentiment_analysis import perform_market_research
+from checkpointing import get_checkpointer, run_graph
+from workflow_state import (
+    AnalysisState,
+    artifact_store,
+    format_structured_results,
+    latest_values,
+    summarize_tool_result,
+)
 import langsmith
 
 # 1) Load environment variables
@@ -64,19 +73,19 @@ tools_by_name = {
 # A "tool-enabled" version of the LLM:
 tool_enabled_llm = llm.bind_tools(technical_analysis_tools)
 
-# 4) Create the Graph using MessagesState
-workflow = StateGraph(MessagesState)
+# 4) Create the Graph. AnalysisState keeps messages within budget and stores
+# bulky tool payloads by reference (see workflow_state.py).
+workflow = StateGraph(AnalysisState)
 
 # -----------------------------------------------------------------------
 # Define our NODES
 # -----------------------------------------------------------------------
 
-def technical_analysis_data_collector(state: MessagesState) -> MessagesState:
+def technical_analysis_data_collector(state: AnalysisState) -> AnalysisState:
     """
     1) Add a system message that instructs the LLM on the role (TA expert).
     2) Append LLM's response to the conversation.
     """
-    old_messages = state["messages"]
     top_stocks = get_top_stocks(5)
     
     # We can prepend a SystemMessage for context:
@@ -95,13 +104,13 @@ def technical_analysis_data_collector(state: MessagesState) -> MessagesState:
     # The LLM sees your system message plus everything so far:
     new_llm_response = tool_enabled_llm.invoke([system_prompt])
 
-    # Return updated conversation with the new LLM message appended
+    # Append the new LLM message to the conversation
     return {
-        "messages": old_messages + [new_llm_response]
+        "messages": [new_llm_response]
     }
 
 
-def should_continue(state: MessagesState) -> Literal["tool_node", "do_technical_analysis"]:
+def should_continue(state: AnalysisState) -> Literal["tool_node", "do_technical_analysis"]:
     """
     If the last LLM message has tool calls, route to the tool_node.
     Otherwise, aggregate data.
@@ -113,16 +122,21 @@ def should_continue(state: MessagesState) -> Literal["tool_node", "do_technical_
     return "do_technical_analysis"
 
 
-def tool_node(state: MessagesState) -> MessagesState:
-    old_messages = state["messages"]
-    last_message = old_messages[-1]
+def tool_node(state: AnalysisState, config: RunnableConfig) -> AnalysisState:
+    """
+    Run the requested tools. Full results go to the artifact store; the
+    conversation only gets a short summary with a reference.
+    """
+    last_message = state["messages"][-1]
     tool_calls = getattr(last_message, "tool_calls", [])
 
     if not tool_calls:
         print("No tool calls found in last message.")
-        return {"messages": old_messages}
+        return {}
 
     tool_outputs = []
+    artifacts = {}
+    indicators = {}
     for call in tool_calls:
         try:
             name = call["name"]
@@ -136,38 +150,47 @@ def tool_node(state: MessagesState) -> MessagesState:
                 continue
         
             result = tool.invoke(args)  # Ensure correct argument passing
+            ref = artifact_store.put(result, run_key=config.get("configurable", {}).get("thread_id"))
+            summary = summarize_tool_result(name, args, result, ref)
+            artifacts[ref] = f"{name}({args.get('ticker', '')})"
+            if name == "calculate_technical_indicators":
+                indicators[args.get("ticker", "")] = latest_values(result)
+
             tool_outputs.append(
-                ToolMessage(content=str(result), tool_call_id=call["id"])
+                ToolMessage(content=summary, tool_call_id=call["id"])
             )
         except Exception as e:
             print(f"Error invoking tool {name}: {e}")
 
-    return {"messages": old_messages + tool_outputs}
+    return {"messages": tool_outputs, "artifacts": artifacts, "indicators": indicators}
 
 
-def do_fundemental_analysis(state: MessagesState) -> MessagesState:
+def do_fundemental_analysis(state: AnalysisState) -> AnalysisState:
     print("Performing fundamental analysis...")
     top_stocks = get_top_stocks(10)
     ranked_companies = rank_companies(top_stocks)
     return {
-        "messages": state["messages"] + [SystemMessage(content=f"Fundamental analysis complete. Ranked Companies: {ranked_companies}")]
+        "messages": [SystemMessage(content=f"Fundamental analysis complete ({len(ranked_companies)} companies ranked).")],
+        "rankings": ranked_companies.to_dict(orient="records"),
     }
 
 
-def do_sentimental_analysis(state: MessagesState) -> MessagesState:
+def do_sentimental_analysis(state: AnalysisState) -> AnalysisState:
     """
     Perform market research using sentiment analysis.
     """
     print("Performing market research...")
-    articles = perform_market_research()
+    research = perform_market_research()
+    articles = research["analyzed_news"]
     print(f"Found {len(articles)} articles.")
     return {
-        "messages": state["messages"] + [SystemMessage(content=f"Market research complete. Found {len(articles)} articles.")]
+        "messages": [SystemMessage(content=f"Market research complete. Found {len(articles)} articles.")],
+        "sentiment": research,
     }
     
     
 
-def do_technical_analysis(state: MessagesState) -> MessagesState:
+def do_technical_analysis(state: AnalysisState) -> AnalysisState:
     """
     Aggregates data from previous messages and uses LLM to generate a summary.
     """
@@ -194,12 +217,12 @@ def do_technical_analysis(state: MessagesState) -> MessagesState:
 
     # Append the LLM-generated summary to the conversation
     return {
-        "messages": old_messages + [summary_response]
+        "messages": [summary_response]
     }
 
 
 
-def aggregate_data(state: MessagesState) -> MessagesState:
+def aggregate_data(state: AnalysisState) -> AnalysisState:
     """
     Final step: we 'aggregate' data. For demonstration, we simply call get_top_stocks()
     and append a final SystemMessage summarizing them. 
@@ -211,11 +234,12 @@ def aggregate_data(state: MessagesState) -> MessagesState:
         msg.content for msg in old_messages if isinstance(msg, (SystemMessage, ToolMessage))
     ]
 
-    # Format the prompt for the LLM
+    # Format the prompt for the LLM, including the structured results of all branches
     prompt = SystemMessage(
         content=(
             "Summarize the following technical analysis data and identify the top 10 stocks:\n\n"
-            + "\n".join(relevant_messages) +
+            + "\n".join(relevant_messages)
+            + "\n\n" + format_structured_results(state) +
             "\n\nProvide a concise summary and list the top 05 stock tickers based on relevance."
         )
     )
@@ -227,7 +251,7 @@ def aggregate_data(state: MessagesState) -> MessagesState:
 
     # Append the LLM-generated summary to the conversation
     return {
-        "messages": old_messages + [summary_response]
+        "messages": [summary_response]
     }
 
 # -----------------------------------------------------------------------
@@ -263,8 +287,9 @@ workflow.add_edge("do_sentimental_analysis", "aggregate_data")
 workflow.add_edge("do_technical_analysis", "aggregate_data")
 workflow.add_edge("aggregate_data", END)
 
-# 5) Compile the Workflow
-graph = workflow.compile()
+# 5) Compile the Workflow. Completed node outputs are checkpointed in SQLite so a
+# failed or repeated run resumes instead of starting from zero (see checkpointing.py).
+graph = workflow.compile(checkpointer=get_checkpointer())
 
 if __name__ == "__main__":
     # 6) (Optional) Generate a diagram
@@ -281,11 +306,11 @@ if __name__ == "__main__":
         HumanMessage(content="Analyze the US stock market and give me the best stocks for today.")
     ]
 
-    # The graph expects a dictionary with "messages" for MessagesState:
+    # The graph expects a dictionary with "messages" for AnalysisState:
     initial_state = {"messages": initial_messages}
 
-    # Invoke the workflow
-    final_state = graph.invoke(initial_state)
+    # Invoke the workflow (resumes from checkpoints when available)
+    final_state = run_graph(graph, initial_state)
 
     # 8) Print the entire conversation from final_state
     print("=== FINAL CONVERSATION ===")
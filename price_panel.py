@@ -0,0 +1,151 @@
+import os
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# Directory where downloaded price panels are stored as compressed .npz files
+PANEL_DIR = os.getenv("PRICE_PANEL_DIR", "data")
+
+PRICE_FIELDS = ["open", "high", "low", "close"]
+
+# A stored panel that may still miss bars is refetched after this many seconds
+OPEN_PANEL_MAX_AGE = int(os.getenv("OPEN_PANEL_MAX_AGE_SECONDS", 3600))
+
+# Time after the end date (midnight UTC) by which the last bars are settled at the data source
+FINAL_PANEL_MARGIN = 6 * 3600
+
+
+def build_price_panel(tickers, start_date: str, end_date: str, interval: str = "1d"):
+    """
+    Download OHLCV bars for many tickers in one batch request and lay them out as a
+    dense (dates x tickers) panel.
+
+    Returns a dict with:
+        index   -> int64 epoch seconds, shape (T,)
+        tickers -> list of tickers, length N
+        open/high/low/close -> float32 arrays, shape (T, N), NaN where missing
+        volume  -> int64 array, shape (T, N), 0 where missing
+    """
+    tickers = list(tickers)
+    data = yf.download(
+        tickers,
+        start=start_date,
+        end=end_date,
+        interval=interval,
+        group_by="column",
+        auto_adjust=True,
+        progress=False,
+    )
+    return panel_from_frame(data, tickers)
+
+
+def panel_from_frame(data: pd.DataFrame, tickers):
+    """
+    Convert a yfinance-style frame (columns: field x ticker) into a price panel dict.
+    """
+    tickers = list(tickers)
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+
+    panel = {
+        "index": index.values.astype("datetime64[s]").astype(np.int64),
+        "tickers": tickers,
+    }
+    for field in PRICE_FIELDS:
+        frame = data[field.capitalize()].reindex(columns=tickers)
+        panel[field] = np.ascontiguousarray(frame.to_numpy(dtype=np.float32))
+    volume = data["Volume"].reindex(columns=tickers).fillna(0)
+    panel["volume"] = np.ascontiguousarray(volume.to_numpy(dtype=np.int64))
+    return panel
+
+
+def save_price_panel(panel, name: str, directory: str = PANEL_DIR):
+    """
+    Store a price panel locally so backtests and scans can run without refetching.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.npz")
+    np.savez_compressed(
+        path,
+        index=panel["index"],
+        tickers=np.asarray(panel["tickers"], dtype=str),
+        **{field: panel[field] for field in PRICE_FIELDS + ["volume"]},
+    )
+    return path
+
+
+def load_price_panel(name: str, directory: str = PANEL_DIR):
+    """
+    Load a locally stored price panel saved with `save_price_panel`.
+    """
+    path = os.path.join(directory, f"{name}.npz")
+    with np.load(path) as stored:
+        panel = {
+            "index": stored["index"],
+            "tickers": stored["tickers"].tolist(),
+        }
+        for field in PRICE_FIELDS + ["volume"]:
+            panel[field] = stored[field]
+    return panel
+
+
+def panel_name(tickers, start_date: str, end_date: str, interval: str = "1d"):
+    """
+    Storage name of a panel: the date range and interval plus a hash of the sorted
+    tickers, so different universes of the same size never share a file.
+    """
+    digest = hashlib.sha256(",".join(sorted(tickers)).encode("utf-8")).hexdigest()[:16]
+    return f"panel_{start_date}_{end_date}_{interval}_{digest}"
+
+
+def select_tickers(panel, tickers):
+    """Return a view of the panel restricted to `tickers`, in that order."""
+    tickers = list(tickers)
+    if tickers == panel["tickers"]:
+        return panel
+    positions = {ticker: i for i, ticker in enumerate(panel["tickers"])}
+    columns = [positions[ticker] for ticker in tickers]
+    selected = {"index": panel["index"], "tickers": tickers}
+    for field in PRICE_FIELDS + ["volume"]:
+        selected[field] = np.ascontiguousarray(panel[field][:, columns])
+    return selected
+
+
+def _is_final(path: str, end_date: str):
+    """
+    A stored panel is final if it was written after its (exclusive) end date plus
+    FINAL_PANEL_MARGIN, when the last bars have settled. Any other panel may miss
+    bars and is reused only for OPEN_PANEL_MAX_AGE seconds.
+    """
+    written_at = os.path.getmtime(path)
+    settled_at = (pd.Timestamp(end_date, tz="UTC") + pd.Timedelta(seconds=FINAL_PANEL_MARGIN)).timestamp()
+    if written_at >= settled_at:
+        return True
+    return time.time() - written_at < OPEN_PANEL_MAX_AGE
+
+
+def get_price_panel(tickers, start_date: str, end_date: str, name: str = None, refresh: bool = False,
+                    interval: str = "1d"):
+    """
+    Return the locally stored panel `name` if present, otherwise download it and store it.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    name = name or panel_name(tickers, start_date, end_date, interval)
+    path = os.path.join(PANEL_DIR, f"{name}.npz")
+    if not refresh and os.path.exists(path) and _is_final(path, end_date):
+        panel = load_price_panel(name)
+        if sorted(panel["tickers"]) == sorted(tickers):
+            return select_tickers(panel, tickers)
+
+    print(f"📥 Downloading price panel for {len(tickers)} tickers...")
+    panel = build_price_panel(tickers, start_date, end_date, interval=interval)
+    save_price_panel(panel, name)
+    return panel
+
+
+def panel_dates(panel):
+    """Return the panel index as numpy datetime64[s] values."""
+    return panel["index"].astype("datetime64[s]")
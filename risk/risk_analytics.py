@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+from technical_tools import rolling_std
+
+# Trading days per year, used to annualize volatility
+PERIODS_PER_YEAR = 252
+
+# Minimum share of non-missing returns for a ticker to enter the covariance matrix
+MIN_COVERAGE = 0.8
+
+# ----------------------------------------------------------------------------
+# RETURNS AND VOLATILITY
+# ----------------------------------------------------------------------------
+
+
+def returns_matrix(close, log: bool = False):
+    """
+    Daily returns of every ticker from a (dates x tickers) close array.
+    Returns have shape (dates - 1, tickers) with NaN where a price is missing.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if log:
+            return np.diff(np.log(close), axis=0)
+        return close[1:] / close[:-1] - 1
+
+
+def rolling_volatility(returns, window: int = 20):
+    """Annualized rolling volatility of every ticker."""
+    return rolling_std(returns, window) * np.sqrt(PERIODS_PER_YEAR)
+
+
+# ----------------------------------------------------------------------------
+# COVARIANCE, CORRELATION AND BETA
+# ----------------------------------------------------------------------------
+
+
+def shrinkage_covariance(returns):
+    """
+    Ledoit-Wolf covariance: the sample covariance shrunk towards a scaled
+    identity with the optimal shrinkage intensity. Two BLAS matrix products,
+    so a 500 x 500 matrix takes milliseconds.
+
+    Missing returns are treated as zero after demeaning.
+    :return: (covariance, shrinkage) — daily covariance, shape (tickers, tickers)
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    n, p = returns.shape
+    X = returns - np.nanmean(returns, axis=0)
+    X = np.where(np.isnan(X), 0.0, X)
+
+    sample = X.T @ X / n
+    mu = np.trace(sample) / p
+    X2 = X ** 2
+    beta = ((X2.T @ X2).sum() / n - (sample ** 2).sum()) / (p * n)
+    delta = ((sample - mu * np.eye(p)) ** 2).sum() / p
+    beta = min(beta, delta)
+    shrinkage = 0.0 if delta == 0 else beta / delta
+
+    covariance = (1 - shrinkage) * sample
+    covariance[np.diag_indices(p)] += shrinkage * mu
+    return covariance, shrinkage
+
+
+def correlation_matrix(covariance):
+    """Correlation matrix from a covariance matrix."""
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = covariance / np.outer(std, std)
+    np.fill_diagonal(correlation, 1.0)
+    return correlation
+
+
+def betas(returns, market_returns=None):
+    """
+    Beta of every ticker against `market_returns` (default: the equal-weighted
+    average of the universe).
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if market_returns is None:
+        market_returns = np.nanmean(returns, axis=1)
+    market = market_returns - np.nanmean(market_returns)
+    X = returns - np.nanmean(returns, axis=0)
+    valid = ~np.isnan(X)
+    X = np.where(valid, X, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (X.T @ market) / ((valid * market[:, None] ** 2).sum(axis=0))
+
+
+# ----------------------------------------------------------------------------
+# PORTFOLIO CONSTRUCTION
+# ----------------------------------------------------------------------------
+
+
+def min_variance_weights(covariance, long_only: bool = True):
+    """
+    Minimum-variance weights (sum to 1). With `long_only`, tickers that get a
+    negative weight are dropped and the rest re-solved until all weights are >= 0.
+    """
+    p = covariance.shape[0]
+    active = np.ones(p, dtype=bool)
+    weights = np.zeros(p)
+    while active.any():
+        sub = covariance[np.ix_(active, active)]
+        raw = np.linalg.solve(sub, np.ones(active.sum()))
+        w = raw / raw.sum()
+        if not long_only or (w >= 0).all():
+            weights[active] = w
+            break
+        # Drop the tickers with negative weights and solve again
+        active[np.flatnonzero(active)[w < 0]] = False
+    return weights
+
+
+def risk_contributions(weights, covariance):
+    """Share of portfolio variance contributed by each position (sums to 1)."""
+    marginal = covariance @ weights
+    variance = weights @ marginal
+    return weights * marginal / variance if variance > 0 else np.zeros_like(weights)
+
+
+def risk_parity_weights(covariance, budgets=None, iterations: int = 500, tolerance: float = 1e-10):
+    """
+    Long-only weights whose risk contributions match `budgets` (default: equal).
+    Uses multiplicative fixed-point updates, one matrix-vector product each.
+    """
+    p = covariance.shape[0]
+    budgets = np.full(p, 1.0 / p) if budgets is None else np.asarray(budgets, dtype=np.float64) / np.sum(budgets)
+    weights = 1 / np.sqrt(np.diag(covariance))
+    weights /= weights.sum()
+    for _ in range(iterations):
+        contributions = risk_contributions(weights, covariance)
+        updated = weights * np.sqrt(budgets / np.maximum(contributions, 1e-16))
+        updated /= updated.sum()
+        if np.abs(updated - weights).max() < tolerance:
+            return updated
+        weights = updated
+    return weights
+
+
+def _score_tilt(scores, tilt: float):
+    """Min-max scaled scores mapped to [0.1, 1] and raised to `tilt`."""
+    scores = np.asarray(scores, dtype=np.float64)
+    spread = scores.max() - scores.min()
+    scaled = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+    return (0.1 + 0.9 * scaled) ** tilt
+
+
+def risk_aware_weights(scores, covariance, method: str = "risk_parity", tilt: float = 1.0):
+    """
+    Turn ranking scores into portfolio weights that account for volatility and
+    correlation.
+
+    :param scores: score per ticker, aligned with `covariance` (e.g. `Final_Score`)
+    :param method: "risk_parity" — risk budgets proportional to the tilted scores;
+                   "min_variance" — minimum-variance weights multiplied by the tilted scores
+    :param tilt: strength of the score tilt (0 = ignore scores)
+    """
+    tilted = _score_tilt(scores, tilt)
+    if method == "risk_parity":
+        return risk_parity_weights(covariance, budgets=tilted)
+    if method == "min_variance":
+        weights = min_variance_weights(covariance) * tilted
+        return weights / weights.sum() if weights.sum() > 0 else weights
+    raise ValueError(f"Unknown weighting method: {method}")
+
+
+# ----------------------------------------------------------------------------
+# REPORT
+# ----------------------------------------------------------------------------
+
+
+def risk_report(panel, ranking, window: int = PERIODS_PER_YEAR, method: str = "risk_parity", tilt: float = 1.0):
+    """
+    Risk analytics for ranked tickers from the cached price panel.
+
+    :param panel: price panel dict from `price_panel`
+    :param ranking: `rank_companies` DataFrame (Ticker, Final_Score) or {ticker: score}
+    :param window: number of recent daily returns used for the estimates
+    :return: (report DataFrame, correlation DataFrame)
+    """
+    if hasattr(ranking, "to_numpy"):
+        ranking = dict(zip(ranking["Ticker"], ranking["Final_Score"]))
+
+    returns = returns_matrix(panel["close"])[-window:]
+    coverage = (~np.isnan(returns)).mean(axis=0)
+    market = np.nanmean(returns, axis=1)
+
+    positions = {ticker: i for i, ticker in enumerate(panel["tickers"])}
+    tickers = [t for t in ranking if t in positions and coverage[positions[t]] >= MIN_COVERAGE]
+    columns = [positions[t] for t in tickers]
+    if not tickers:
+        return pd.DataFrame(columns=["Ticker", "Final_Score", "Volatility", "Beta", "Weight", "Risk_Contribution"]), pd.DataFrame()
+
+    sub_returns = returns[:, columns]
+    covariance, shrinkage = shrinkage_covariance(sub_returns)
+    scores = np.array([ranking[t] for t in tickers], dtype=np.float64)
+    weights = risk_aware_weights(scores, covariance, method, tilt)
+
+    report = pd.DataFrame({
+        "Ticker": tickers,
+        "Final_Score": scores,
+        "Volatility": np.sqrt(np.diag(covariance) * PERIODS_PER_YEAR),
+        "Beta": betas(sub_returns, market),
+        "Weight": weights,
+        "Risk_Contribution": risk_contributions(weights, covariance),
+    }).sort_values(by="Weight", ascending=False, ignore_index=True)
+    report.attrs["shrinkage"] = float(shrinkage)
+    report.attrs["portfolio_volatility"] = float(np.sqrt(weights @ covariance @ weights * PERIODS_PER_YEAR))
+
+    correlation = pd.DataFrame(correlation_matrix(covariance), index=tickers, columns=tickers)
+    return report, correlation
+
+
+# ----------------------------------------------------------------------------
+# DEMO USAGE (run from the repository root: python -m risk.risk_analytics)
+# ----------------------------------------------------------------------------
+if __name__ == "__main__":
+    from top_stocks import get_top_stocks
+    from price_panel import get_price_panel
+    from fundamental.fundamental_analysis import rank_companies
+
+    tickers = get_top_stocks(10)
+    panel = get_price_panel(tickers, "2024-01-01", "2024-12-31")
+    report, correlation = risk_report(panel, rank_companies(tickers))
+    print(report)
+    print(f"Portfolio volatility: {report.attrs['portfolio_volatility']:.2%}")
+    print(correlation.round(2))
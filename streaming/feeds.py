@@ -0,0 +1,112 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+
+# ----------------------------------------------------------------------------
+# FEED ADAPTERS
+# A feed is anything with an async `ticks()` generator yielding
+# (symbol, epoch_seconds, price, size) tuples.
+# ----------------------------------------------------------------------------
+
+
+class MarketFeed(ABC):
+    """
+    Base class for tick feeds. Subclasses implement `ticks()`.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+
+    @abstractmethod
+    async def ticks(self):
+        """Async generator of (symbol, epoch_seconds, price, size) tuples."""
+
+
+class SimulatedFeed(MarketFeed):
+    """
+    Local random-walk feed for development and testing, no API key needed.
+    """
+
+    def __init__(self, symbols, ticks_per_second: float = 500, volatility: float = 0.0005, seed: int = None):
+        super().__init__(symbols)
+        self.ticks_per_second = ticks_per_second
+        self.volatility = volatility
+        self.random = random.Random(seed)
+        self.prices = {symbol: self.random.uniform(20, 500) for symbol in self.symbols}
+
+    async def ticks(self):
+        batch = max(1, int(self.ticks_per_second / 20))
+        while True:
+            now = time.time()
+            for _ in range(batch):
+                symbol = self.random.choice(self.symbols)
+                price = self.prices[symbol] * (1 + self.random.gauss(0, self.volatility))
+                self.prices[symbol] = price
+                yield symbol, now, round(price, 2), self.random.randint(1, 500)
+            await asyncio.sleep(batch / self.ticks_per_second)
+
+
+class PolygonFeed(MarketFeed):
+    """
+    Real-time trades from Polygon.io (requires POLYGON_API_KEY and a real-time plan).
+    """
+
+    def __init__(self, symbols, api_key: str = None, max_pending: int = 100_000):
+        super().__init__(symbols)
+        self.api_key = api_key or os.getenv("POLYGON_API_KEY")
+        self.max_pending = max_pending
+
+    async def ticks(self):
+        from polygon import WebSocketClient
+        from polygon.websocket.models import Feed, Market
+
+        queue = asyncio.Queue(maxsize=self.max_pending)
+
+        async def handle(messages):
+            for message in messages:
+                if queue.full():
+                    logging.warning("Polygon feed is falling behind, dropping a trade.")
+                    queue.get_nowait()
+                queue.put_nowait((message.symbol, message.timestamp / 1000, message.price, message.size))
+
+        client = WebSocketClient(
+            api_key=self.api_key,
+            feed=Feed.RealTime,
+            market=Market.Stocks,
+            subscriptions=[f"T.{symbol}" for symbol in self.symbols],
+        )
+        def closed(task):
+            # Wake up the consumer so a dropped connection surfaces as an error
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+        connection = asyncio.create_task(client.connect(handle))
+        connection.add_done_callback(closed)
+        try:
+            while True:
+                trade = await queue.get()
+                if trade is None:
+                    if not connection.cancelled() and connection.exception():
+                        raise connection.exception()
+                    raise ConnectionError("Polygon connection closed")
+                yield trade
+        finally:
+            connection.cancel()
+            await client.close()
+
+
+FEEDS = {
+    "simulated": SimulatedFeed,
+    "polygon": PolygonFeed,
+}
+
+
+def create_feed(name: str, symbols, **kwargs):
+    """Build the feed adapter registered under `name`."""
+    if name not in FEEDS:
+        raise ValueError(f"Unknown market feed: {name}. Available feeds: {', '.join(FEEDS)}")
+    return FEEDS[name](symbols, **kwargs)
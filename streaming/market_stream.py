@@ -0,0 +1,328 @@
+import os
+import time
+import asyncio
+import logging
+import numpy as np
+from streaming.feeds import create_feed
+
+# Closed bars kept per symbol: enough for the 200-bar moving average
+HISTORY = 199
+
+INDICATOR_FIELDS = [
+    "MA_50", "MA_200", "RSI", "MACD", "Signal_Line",
+    "BB_Middle", "BB_Upper", "BB_Lower", "%K", "%D",
+]
+FIELDS = ["price", "change", "volume"] + INDICATOR_FIELDS
+
+# Delay before reconnecting a failed feed, doubled after each failure up to the maximum
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 60.0
+
+
+def _ema_step(previous, value, span: int):
+    """One step of `ewm(span=span, adjust=False)`, starting at the first value."""
+    alpha = 2.0 / (span + 1.0)
+    return np.where(np.isnan(previous), value, previous + alpha * (value - previous))
+
+
+class LiveIndicators:
+    """
+    Aggregates ticks into time bars and keeps the technical indicators of every
+    symbol up to date incrementally.
+
+    Closed bars are kept in fixed-size arrays (symbols x HISTORY) and EMAs are
+    carried forward as state, so a tick costs O(1) and a snapshot only looks at
+    the last window of the symbols that changed. Indicators include the bar that
+    is still forming, with the same formulas as `calculate_technical_indicators`.
+    """
+
+    def __init__(self, symbols, bar_interval: int = 60):
+        self.symbols = list(symbols)
+        self.positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.bar_interval = bar_interval
+        n = len(self.symbols)
+
+        self.close_hist = np.full((n, HISTORY), np.nan)
+        self.high_hist = np.full((n, HISTORY), np.nan)
+        self.low_hist = np.full((n, HISTORY), np.nan)
+        self.k_hist = np.full((n, 2), np.nan)
+        self.ema_12 = np.full(n, np.nan)
+        self.ema_26 = np.full(n, np.nan)
+        self.signal_9 = np.full(n, np.nan)
+
+        # Bar that is currently forming
+        self.bar_id = np.full(n, -1, dtype=np.int64)
+        self.bar_high = np.full(n, np.nan)
+        self.bar_low = np.full(n, np.nan)
+        self.bar_close = np.full(n, np.nan)
+        self.bar_volume = np.zeros(n, dtype=np.int64)
+
+        self.first_price = np.full(n, np.nan)
+        self.dirty = np.zeros(n, dtype=bool)
+
+    def on_tick(self, symbol: str, timestamp: float, price: float, size: int = 0):
+        i = self.positions.get(symbol)
+        if i is None:
+            return
+        bar_id = int(timestamp // self.bar_interval)
+        if bar_id > self.bar_id[i]:
+            if self.bar_id[i] >= 0:
+                self._close_bar(i)
+            self.bar_id[i] = bar_id
+            self.bar_high[i] = self.bar_low[i] = price
+            self.bar_volume[i] = 0
+        elif bar_id < self.bar_id[i]:
+            return  # Late tick for a bar that is already closed
+
+        if np.isnan(self.first_price[i]):
+            self.first_price[i] = price
+        self.bar_high[i] = max(self.bar_high[i], price)
+        self.bar_low[i] = min(self.bar_low[i], price)
+        self.bar_close[i] = price
+        self.bar_volume[i] += size
+        self.dirty[i] = True
+
+    def _close_bar(self, i: int):
+        """Commit the forming bar of symbol `i` to the history and EMA state."""
+        row = np.array([i])
+        k = self._compute(row)["%K"][0]
+
+        for hist, value in ((self.close_hist, self.bar_close), (self.high_hist, self.bar_high), (self.low_hist, self.bar_low)):
+            hist[i, :-1] = hist[i, 1:]
+            hist[i, -1] = value[i]
+        self.k_hist[i, 0] = self.k_hist[i, 1]
+        self.k_hist[i, 1] = k
+
+        close = self.bar_close[i]
+        self.ema_12[i] = _ema_step(self.ema_12[i], close, 12)
+        self.ema_26[i] = _ema_step(self.ema_26[i], close, 26)
+        self.signal_9[i] = _ema_step(self.signal_9[i], self.ema_12[i] - self.ema_26[i], 9)
+
+    def _compute(self, rows):
+        """Indicators for `rows`, treating the forming bar as the latest bar."""
+        close = self.bar_close[rows]
+        closes = np.hstack([self.close_hist[rows], close[:, None]])
+        highs = np.hstack([self.high_hist[rows][:, -13:], self.bar_high[rows][:, None]])
+        lows = np.hstack([self.low_hist[rows][:, -13:], self.bar_low[rows][:, None]])
+        values = {}
+
+        # Moving Averages (NaN until the window is full)
+        values["MA_50"] = closes[:, -50:].mean(axis=1)
+        values["MA_200"] = closes[:, -200:].mean(axis=1)
+
+        # RSI Calculation
+        delta = np.diff(closes[:, -15:], axis=1)
+        gain = np.where(delta > 0, delta, 0.0).mean(axis=1)
+        loss = np.where(delta < 0, -delta, 0.0).mean(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rsi = 100 - (100 / (1 + gain / loss))
+        values["RSI"] = np.where(np.isnan(delta).any(axis=1), np.nan, rsi)
+
+        # MACD Calculation
+        macd = _ema_step(self.ema_12[rows], close, 12) - _ema_step(self.ema_26[rows], close, 26)
+        values["MACD"] = macd
+        values["Signal_Line"] = _ema_step(self.signal_9[rows], macd, 9)
+
+        # Bollinger Bands
+        window = closes[:, -20:]
+        middle = window.mean(axis=1)
+        std = window.std(axis=1, ddof=1)
+        values["BB_Middle"] = middle
+        values["BB_Upper"] = middle + std * 2
+        values["BB_Lower"] = middle - std * 2
+
+        # Stochastic Oscillator
+        low_14, high_14 = lows.min(axis=1), highs.max(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            k = (close - low_14) / (high_14 - low_14) * 100
+        values["%K"] = k
+        values["%D"] = np.hstack([self.k_hist[rows], k[:, None]]).mean(axis=1)
+
+        return values
+
+    def change(self, rows=None):
+        """Percent change since the first tick of the session."""
+        rows = slice(None) if rows is None else rows
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (self.bar_close[rows] / self.first_price[rows] - 1) * 100
+
+    def snapshot(self, rows=None):
+        """
+        Price, change (% since the first tick) and indicators for `rows`
+        (default: all symbols), as a (rows x FIELDS) array.
+        """
+        rows = np.arange(len(self.symbols)) if rows is None else np.asarray(rows)
+        values = self._compute(rows)
+        columns = [self.bar_close[rows], self.change(rows), self.bar_volume[rows].astype(np.float64)]
+        columns += [values[field] for field in INDICATOR_FIELDS]
+        return np.column_stack(columns) if len(rows) else np.empty((0, len(FIELDS)))
+
+
+def _to_json(value):
+    return None if not np.isfinite(value) else round(float(value), 4)
+
+
+class MarketStream:
+    """
+    Consumes a feed, keeps `LiveIndicators` up to date and pushes only changed
+    values and rank moves to subscribers every `publish_interval` seconds.
+
+    Symbols are ranked by change since the first tick of the session.
+    """
+
+    def __init__(self, feed, bar_interval: int = 60, publish_interval: float = 0.25):
+        self.feed = feed
+        self.indicators = LiveIndicators(feed.symbols, bar_interval)
+        self.publish_interval = publish_interval
+        n = len(feed.symbols)
+        self.published = np.full((n, len(FIELDS)), np.nan)
+        self.ranks = np.full(n, -1, dtype=np.int64)
+        self.subscribers = set()
+        self._tasks = []
+
+    async def start(self):
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._consume()),
+                asyncio.create_task(self._publish_loop()),
+            ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def subscribe(self, maxsize: int = 100):
+        queue = asyncio.Queue(maxsize=maxsize)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def _consume(self):
+        """Read ticks from the feed, reconnecting with exponential backoff when it fails."""
+        delay = RECONNECT_DELAY
+        while True:
+            connected_at = time.monotonic()
+            try:
+                async for symbol, timestamp, price, size in self.feed.ticks():
+                    self.indicators.on_tick(symbol, timestamp, price, size)
+                logging.warning("Market feed ended.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Market feed stopped: {e}")
+            # A connection that stayed up for a while starts the backoff over
+            if time.monotonic() - connected_at > MAX_RECONNECT_DELAY:
+                delay = RECONNECT_DELAY
+            logging.info(f"Reconnecting market feed in {delay:.0f}s.")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _publish_loop(self):
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            message = self.collect_updates()
+            if message:
+                self.broadcast(message)
+
+    def _rank(self):
+        """0-based rank of every symbol by change, symbols without ticks last."""
+        change = self.indicators.change()
+        order = np.argsort(np.where(np.isnan(change), np.inf, -change), kind="stable")
+        ranks = np.empty_like(order)
+        ranks[order] = np.arange(len(order))
+        return ranks
+
+    def collect_updates(self):
+        """
+        Diff dirty symbols against what was last published.
+        Returns an "update" message, or None when nothing changed.
+        """
+        rows = np.flatnonzero(self.indicators.dirty)
+        if not len(rows):
+            return None
+        self.indicators.dirty[rows] = False
+
+        current = self.indicators.snapshot(rows)
+        previous = self.published[rows]
+        changed = ~np.isclose(current, previous, equal_nan=True, rtol=1e-6, atol=1e-9)
+        self.published[rows] = current
+
+        updates = []
+        for row, values, mask in zip(rows, current, changed):
+            if mask.any():
+                fields = {FIELDS[j]: _to_json(values[j]) for j in np.flatnonzero(mask)}
+                updates.append({"symbol": self.indicators.symbols[row], **fields})
+
+        ranks = self._rank()
+        moved = np.flatnonzero(ranks != self.ranks)
+        rank_moves = [
+            {"symbol": self.indicators.symbols[i], "from": int(self.ranks[i]) + 1 if self.ranks[i] >= 0 else None, "to": int(ranks[i]) + 1}
+            for i in moved
+        ]
+        self.ranks = ranks
+
+        if not updates and not rank_moves:
+            return None
+        return {"type": "update", "updates": updates, "rank_moves": rank_moves}
+
+    def snapshot_message(self):
+        """Full state of every symbol, sent to new subscribers and after overflows."""
+        current = self.indicators.snapshot()
+        ranks = self._rank()
+        return {
+            "type": "snapshot",
+            "updates": [
+                {"symbol": symbol, "rank": int(ranks[i]) + 1, **{field: _to_json(current[i, j]) for j, field in enumerate(FIELDS)}}
+                for i, symbol in enumerate(self.indicators.symbols)
+            ],
+            "rank_moves": [],
+        }
+
+    def broadcast(self, message):
+        for queue in list(self.subscribers):
+            if queue.full():
+                # Slow client: drop its backlog and resync it with a full snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot_message())
+            else:
+                queue.put_nowait(message)
+
+
+def filter_message(message, symbols):
+    """Restrict a stream message to the given set of symbols."""
+    if not symbols:
+        return message
+    return {
+        **message,
+        "updates": [update for update in message["updates"] if update["symbol"] in symbols],
+        "rank_moves": [move for move in message["rank_moves"] if move["symbol"] in symbols],
+    }
+
+
+_market_stream = None
+_market_stream_lock = asyncio.Lock()
+
+
+async def get_market_stream():
+    """
+    Shared stream for the app, started on first use.
+    Configured with MARKET_FEED (default "simulated"), STREAM_SYMBOLS (comma
+    separated, default the top 100 stocks) and STREAM_BAR_SECONDS.
+    """
+    global _market_stream
+    async with _market_stream_lock:
+        if _market_stream is None:
+            symbols = [s.strip() for s in os.getenv("STREAM_SYMBOLS", "").split(",") if s.strip()]
+            if not symbols:
+                from top_stocks import get_top_stocks
+                symbols = await asyncio.to_thread(get_top_stocks, 100)
+
+            feed = create_feed(os.getenv("MARKET_FEED", "simulated"), symbols)
+            _market_stream = MarketStream(feed, bar_interval=int(os.getenv("STREAM_BAR_SECONDS", 60)))
+            await _market_stream.start()
+    return _market_stream
@@ -1,32 +1,33 @@
-import time
+import os
+import numpy as np
 from langchain_core.tools import tool
 import yfinance as yf
-from functools import lru_cache
+from bar_cache import BarCache, bars_from_frame, frame_from_bars
 
-# Dictionary to cache stock data to avoid multiple API calls
-stock_data_cache = {}
+# Memory-bounded cache of compact bars to avoid multiple API calls
+stock_data_cache = BarCache(
+    max_bytes=int(os.getenv("BAR_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+    ttl=3600,
+)
 
 
 def fetch_stock_data(ticker: str, start_date: str, end_date: str, interval: str = "1d", cache_duration=3600):
     """
     Fetch stock data only once per ticker for the given time period.
     Cache expires after `cache_duration` seconds.
+    Returns a new DataFrame on every call, so callers may modify it freely.
     """
     cache_key = f"{ticker}_{start_date}_{end_date}_{interval}"
-    current_time = time.time()
 
     # Check if data exists and is still valid
-    if cache_key in stock_data_cache:
-        cached_time, data = stock_data_cache[cache_key]
-        if current_time - cached_time < cache_duration:
-            return data  # Use cached data
+    bars = stock_data_cache.get(cache_key, max_age=cache_duration)
+    if bars is None:
+        # Fetch new data and update cache
+        stock = yf.Ticker(ticker)
+        data = stock.history(start=start_date, end=end_date, interval=interval)
+        bars = stock_data_cache.put(cache_key, bars_from_frame(data))
 
-    # Fetch new data and update cache
-    stock = yf.Ticker(ticker)
-    data = stock.history(start=start_date, end=end_date, interval=interval)
-    stock_data_cache[cache_key] = (current_time, data)
-    
-    return data
+    return frame_from_bars(bars)
 
 
 
@@ -86,6 +87,135 @@ def calculate_technical_indicators(ticker: str, start_date: str, end_date: str):
     return data.reset_index().to_dict(orient="records")
 
 
+# -----------------------------------------------------------------------
+# Vectorized indicators over a (dates x tickers) price panel.
+# Same formulas as `calculate_technical_indicators`, computed for every
+# ticker at once with NumPy instead of one DataFrame per ticker.
+# -----------------------------------------------------------------------
+
+def rolling_mean(values, window: int):
+    """
+    Rolling mean along the date axis. Windows containing NaN yield NaN (pandas default).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.shape[0] < window:
+        return out
+
+    valid = ~np.isnan(values)
+    csum = np.cumsum(np.where(valid, values, 0.0), axis=0)
+    ccount = np.cumsum(valid, axis=0)
+    window_sum = csum[window - 1:].copy()
+    window_sum[1:] -= csum[:-window]
+    window_count = ccount[window - 1:].copy()
+    window_count[1:] -= ccount[:-window]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[window - 1:] = np.where(window_count == window, window_sum / window, np.nan)
+    return out
+
+
+def rolling_std(values, window: int):
+    """
+    Rolling sample standard deviation (ddof=1) along the date axis.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    # Center each column first to keep the sum-of-squares formula numerically stable
+    centered = values - np.nanmean(values, axis=0) if values.size else values
+    mean = rolling_mean(centered, window)
+    mean_sq = rolling_mean(centered ** 2, window)
+    var = (mean_sq - mean ** 2) * window / (window - 1)
+    return np.sqrt(np.clip(var, 0.0, None))
+
+
+def rolling_extreme(values, window: int, func=np.min):
+    """
+    Rolling min/max along the date axis using a strided window view (no copies).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.shape[0] < window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+    out[window - 1:] = func(windows, axis=-1)
+    return out
+
+
+def ewm_mean(values, span: int):
+    """
+    Exponential moving average matching pandas `ewm(span=span, adjust=False)`.
+    Loops over dates only; every ticker is updated in the same vector step.
+    As in pandas (`ignore_na=False`), the previous average keeps decaying across
+    missing values and the last average is carried through the gap.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty(values.shape)
+    prev = np.full(values.shape[1:], np.nan)
+    old_weight = np.ones(values.shape[1:])
+    for i in range(len(values)):
+        row = values[i]
+        missing = np.isnan(row)
+        started = ~np.isnan(prev)
+        old_weight = np.where(started, old_weight * (1 - alpha), old_weight)
+        blended = (old_weight * prev + alpha * row) / (old_weight + alpha)
+        prev = np.where(missing, prev, np.where(started, blended, row))
+        old_weight = np.where(missing, old_weight, 1.0)
+        out[i] = prev
+    return out
+
+
+def compute_indicator_panel(close, high, low):
+    """
+    Calculate the technical indicators for a whole price panel.
+
+    :param close, high, low: arrays of shape (dates, tickers)
+    :return: dict of indicator name -> array of shape (dates, tickers), using the
+             same column names as `calculate_technical_indicators`.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    indicators = {}
+
+    # Moving Averages
+    indicators["MA_50"] = rolling_mean(close, 50)
+    indicators["MA_200"] = rolling_mean(close, 200)
+
+    # RSI Calculation
+    delta = np.full(close.shape, np.nan)
+    delta[1:] = close[1:] - close[:-1]
+    gain = rolling_mean(np.where(delta > 0, delta, 0.0), 14)
+    loss = rolling_mean(np.where(delta < 0, -delta, 0.0), 14)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs = gain / loss
+        indicators["RSI"] = 100 - (100 / (1 + rs))
+
+    # MACD Calculation
+    macd = ewm_mean(close, 12) - ewm_mean(close, 26)
+    indicators["MACD"] = macd
+    indicators["Signal_Line"] = ewm_mean(macd, 9)
+
+    # Bollinger Bands
+    bb_middle = rolling_mean(close, 20)
+    bb_std = rolling_std(close, 20)
+    indicators["BB_Middle"] = bb_middle
+    indicators["BB_Upper"] = bb_middle + bb_std * 2
+    indicators["BB_Lower"] = bb_middle - bb_std * 2
+
+    # Stochastic Oscillator
+    low14 = rolling_extreme(low, 14, np.min)
+    high14 = rolling_extreme(high, 14, np.max)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percent_k = (close - low14) / (high14 - low14) * 100
+    indicators["L14"] = low14
+    indicators["H14"] = high14
+    indicators["%K"] = percent_k
+    indicators["%D"] = rolling_mean(percent_k, 3)
+
+    return indicators
+
+
 # @tool
 # def get_intraday_data_fixed(params):
 #     """Ensure only recent data is retrieved to prevent Yahoo Finance errors."""
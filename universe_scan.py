@@ -0,0 +1,206 @@
+import os
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from price_panel import PRICE_FIELDS, get_price_panel
+from technical_tools import compute_indicator_panel
+from backtest.backtest_engine import ma_crossover_signal, macd_signal, rsi_reversion_signal
+
+# Shards per worker: more, smaller shards keep all cores busy when some tickers are slower
+SHARDS_PER_WORKER = 4
+
+# Workers are started from a clean server process instead of forking the caller,
+# which may be a multithreaded web server holding locks
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Panel arrays attached from shared memory, set once per worker process
+_worker_panel = {}
+_worker_blocks = []
+
+
+# ----------------------------------------------------------------------------
+# SHARED MEMORY
+# ----------------------------------------------------------------------------
+
+
+def _share_array(array, blocks):
+    """Copy one array into a new shared memory block and return its description."""
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    blocks.append(block)
+    return block.name, array.shape, array.dtype.str
+
+
+def share_panel(panel, indicators=None):
+    """
+    Copy the panel arrays (and optionally precomputed indicator arrays) into shared
+    memory blocks once, so workers can map them instead of receiving pickled DataFrames.
+
+    :return: (blocks, spec) where `spec` is the small picklable description workers
+             attach to. The caller must close and unlink `blocks` when done.
+    """
+    blocks, spec = [], {"tickers": panel["tickers"], "arrays": {}, "indicators": {}}
+    for field in ["index"] + PRICE_FIELDS + ["volume"]:
+        spec["arrays"][field] = _share_array(panel[field], blocks)
+    for name, values in (indicators or {}).items():
+        spec["indicators"][name] = _share_array(values, blocks)
+    return blocks, spec
+
+
+def release_panel(blocks):
+    """Close and free shared memory blocks created by `share_panel`."""
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def _attach_array(name, shape, dtype):
+    block = shared_memory.SharedMemory(name=name)
+    _worker_blocks.append(block)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    array.flags.writeable = False
+    return array
+
+
+def _attach_panel(spec):
+    """Worker initializer: map the shared panel arrays without copying them."""
+    _worker_panel["tickers"] = spec["tickers"]
+    for field, description in spec["arrays"].items():
+        _worker_panel[field] = _attach_array(*description)
+    _worker_panel["indicators"] = {
+        name: _attach_array(*description) for name, description in spec.get("indicators", {}).items()
+    }
+
+
+# ----------------------------------------------------------------------------
+# FEATURES
+# ----------------------------------------------------------------------------
+
+
+def technical_score(indicators):
+    """Average of the directional signals on the last bar, per ticker (-1 to 1)."""
+    return (
+        ma_crossover_signal(indicators)[-1]
+        + macd_signal(indicators)[-1]
+        + rsi_reversion_signal(indicators)[-1]
+    ) / 3
+
+
+def indicator_snapshot(tickers, close, indicators):
+    """Latest close, indicator values and technical score per ticker, as a DataFrame."""
+    snapshot = pd.DataFrame({name: values[-1] for name, values in indicators.items()})
+    snapshot.insert(0, "Ticker", list(tickers))
+    snapshot.insert(1, "Close", np.asarray(close[-1], dtype=np.float64))
+    snapshot["Technical_Score"] = technical_score(indicators)
+    return snapshot
+
+
+def fetch_fundamental_features(tickers):
+    """Fundamental data for each ticker as a DataFrame (empty row on failure)."""
+    from fundamental.fundamental_tools import get_fundamental_analysis
+
+    features = []
+    for ticker in tickers:
+        try:
+            data = get_fundamental_analysis.invoke(ticker) or {}
+        except Exception as e:
+            print(f"⚠️ Failed to fetch fundamental data for {ticker}: {e}")
+            data = {}
+        features.append({**data, "Ticker": ticker})
+    return pd.DataFrame(features)
+
+
+# ----------------------------------------------------------------------------
+# WORKERS
+# ----------------------------------------------------------------------------
+
+
+def _scan_shard(start: int, stop: int, include_fundamentals: bool):
+    """
+    Compute the latest indicator snapshot (and optionally fundamental features) for
+    tickers `start:stop` of the shared panel. Returns a small DataFrame.
+    Indicators shared by the caller are sliced; otherwise they are computed here.
+    """
+    tickers = _worker_panel["tickers"][start:stop]
+    close = _worker_panel["close"][:, start:stop]
+    if _worker_panel["indicators"]:
+        indicators = {name: values[:, start:stop] for name, values in _worker_panel["indicators"].items()}
+    else:
+        indicators = compute_indicator_panel(close, _worker_panel["high"][:, start:stop], _worker_panel["low"][:, start:stop])
+    snapshot = indicator_snapshot(tickers, close, indicators)
+
+    if include_fundamentals:
+        snapshot = snapshot.merge(fetch_fundamental_features(tickers), on="Ticker", how="left")
+
+    return snapshot
+
+
+# ----------------------------------------------------------------------------
+# ENTRY POINT
+# ----------------------------------------------------------------------------
+
+
+def scan_universe(panel, include_fundamentals: bool = True, max_workers: int = None, indicators=None):
+    """
+    Scan every ticker of a price panel on all cores and return one ranked table.
+
+    The ticker universe is split into shards that a process pool computes in
+    parallel; bars are read from shared memory. Fundamental scores are normalized
+    across the whole universe after the shards are merged.
+
+    :param panel: price panel dict from `price_panel`
+    :param include_fundamentals: also fetch fundamental features and `Final_Score`
+    :param max_workers: worker processes, defaults to all cores
+    :param indicators: indicator arrays already computed for the whole panel
+                       (from `compute_indicator_panel`); workers reuse them instead
+                       of recomputing their shard
+    :return: DataFrame sorted by `Final_Score` (or `Technical_Score` without fundamentals)
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    n_tickers = len(panel["tickers"])
+    n_shards = max(1, min(n_tickers, max_workers * SHARDS_PER_WORKER))
+    bounds = np.linspace(0, n_tickers, n_shards + 1).astype(int)
+
+    blocks, spec = share_panel(panel, indicators)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context(START_METHOD),
+            initializer=_attach_panel,
+            initargs=(spec,),
+        ) as pool:
+            futures = [
+                pool.submit(_scan_shard, start, stop, include_fundamentals)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+                if stop > start
+            ]
+            shards = [future.result() for future in futures]
+    finally:
+        release_panel(blocks)
+
+    table = pd.concat(shards, ignore_index=True)
+
+    if not include_fundamentals:
+        return table.sort_values(by="Technical_Score", ascending=False, ignore_index=True)
+
+    from fundamental.fundamental_analysis import WEIGHTS, score_companies
+
+    scored = score_companies(table[["Ticker"] + [key for key in WEIGHTS if key in table.columns]])
+    table = table.merge(scored[["Ticker", "Final_Score"]], on="Ticker", how="left")
+    return table.sort_values(by=["Final_Score", "Technical_Score"], ascending=False, ignore_index=True)
+
+
+# ----------------------------------------------------------------------------
+# DEMO USAGE
+# ----------------------------------------------------------------------------
+if __name__ == "__main__":
+    from top_stocks import get_top_stocks
+
+    tickers = get_top_stocks(500)
+    panel = get_price_panel(tickers, "2023-01-01", "2024-12-31")
+    ranked = scan_universe(panel)
+    print(ranked[["Ticker", "Close", "RSI", "Technical_Score", "Final_Score"]].head(20))
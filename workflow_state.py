@@ -0,0 +1,227 @@
+import os
+import json
+import uuid
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+from typing import Annotated, TypedDict
+from langgraph.graph import add_messages
+from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage
+from checkpointing import ARTIFACTS_TABLE, CHECKPOINT_DB
+
+# Message budget for the workflow state
+MAX_MESSAGES = 40
+MAX_MESSAGE_CHARS = 20_000   # All message contents together
+MAX_CONTENT_CHARS = 4_000    # A single message content
+PRUNED_MESSAGE_ID = "pruned-messages"
+
+
+# ----------------------------------------------------------------------------
+# SIDE STORAGE
+# Bulky tool payloads are kept here and referenced from the state by key.
+# Payloads can be looked up with GET /artifacts/{ref}.
+# ----------------------------------------------------------------------------
+
+
+def _json_safe(value):
+    """Replace NaN and infinite floats (e.g. indicator warm-up rows) with None."""
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, (float, np.floating)):
+        return float(value) if np.isfinite(value) else None
+    return value
+
+
+class ArtifactStore:
+    """
+    Tool payloads (e.g. full price histories) stored as JSON in the checkpoint
+    database, so refs saved in checkpoints still resolve after a restart and are
+    deleted with their run. Recently used payloads are also kept in memory,
+    within `max_bytes`.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_DB, max_bytes: int = 32 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._nbytes = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(ARTIFACTS_TABLE)
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, ref, text):
+        if len(text) > self.max_bytes:
+            return
+        self._items[ref] = text
+        self._nbytes += len(text)
+        while self._nbytes > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self._nbytes -= len(evicted)
+
+    def put(self, payload, run_key: str = None):
+        ref = uuid.uuid4().hex[:12]
+        text = json.dumps(_json_safe(payload), default=str, allow_nan=False)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO artifacts (ref, run_key, created_at, payload) VALUES (?, ?, ?, ?)",
+                (ref, run_key, time.time(), text),
+            )
+            conn.commit()
+            self._remember(ref, text)
+        return ref
+
+    def get(self, ref):
+        """Return the payload stored under `ref`, or None if it is unknown or expired."""
+        text = self.get_text(ref)
+        return None if text is None else json.loads(text)
+
+    def get_text(self, ref):
+        """Return the stored JSON text of `ref`, or None if it is unknown or expired."""
+        with self._lock:
+            text = self._items.get(ref)
+            if text is not None:
+                self._items.move_to_end(ref)
+            else:
+                row = self._connection().execute("SELECT payload FROM artifacts WHERE ref = ?", (ref,)).fetchone()
+                if row is None:
+                    return None
+                text = row[0]
+                self._remember(ref, text)
+        return text
+
+
+artifact_store = ArtifactStore(max_bytes=int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", 32 * 1024 * 1024)))
+
+
+# ----------------------------------------------------------------------------
+# REDUCERS
+# ----------------------------------------------------------------------------
+
+
+def _content_length(message):
+    return len(message.content) if isinstance(message.content, str) else len(str(message.content))
+
+
+def _truncate(message):
+    if isinstance(message.content, str) and len(message.content) > MAX_CONTENT_CHARS:
+        content = message.content[:MAX_CONTENT_CHARS] + " … [truncated]"
+        return message.model_copy(update={"content": content})
+    return message
+
+
+def add_bounded_messages(left, right):
+    """
+    `add_messages`, then keep the conversation within budget: long contents are
+    truncated and the oldest non-human messages are replaced by a single note.
+    """
+    messages = [_truncate(message) for message in add_messages(left, right)]
+    messages = [message for message in messages if message.id != PRUNED_MESSAGE_ID]
+
+    previous = next((m for m in left or [] if getattr(m, "id", None) == PRUNED_MESSAGE_ID), None)
+    pruned = int(previous.additional_kwargs.get("pruned", 0)) if previous is not None else 0
+
+    total = sum(_content_length(message) for message in messages)
+    i = 0
+    # The pruning note itself counts as one message
+    while (len(messages) + bool(pruned) > MAX_MESSAGES or total > MAX_MESSAGE_CHARS) and i < len(messages):
+        if isinstance(messages[i], HumanMessage):
+            i += 1
+            continue
+        total -= _content_length(messages.pop(i))
+        pruned += 1
+
+    if pruned:
+        note = SystemMessage(
+            content=f"[{pruned} earlier messages pruned; tool data is available by reference]",
+            id=PRUNED_MESSAGE_ID,
+            additional_kwargs={"pruned": pruned},
+        )
+        insert_at = next((j + 1 for j, m in enumerate(messages) if isinstance(m, HumanMessage)), 0)
+        messages.insert(insert_at, note)
+    return messages
+
+
+def merge_dicts(left, right):
+    """Merge dict updates coming from parallel nodes."""
+    return {**(left or {}), **(right or {})}
+
+
+class AnalysisState(TypedDict, total=False):
+    """
+    Workflow state. Messages stay within budget; structured results are carried
+    as small values and bulky tool payloads live in `artifact_store`.
+    """
+    messages: Annotated[list[AnyMessage], add_bounded_messages]
+    artifacts: Annotated[dict, merge_dicts]    # ref -> short description of the payload
+    indicators: Annotated[dict, merge_dicts]   # ticker -> latest indicator values
+    rankings: list[dict]                       # rank_companies rows
+    sentiment: dict                            # top gainers and news sentiment
+
+
+# ----------------------------------------------------------------------------
+# TOOL RESULT SUMMARIES
+# ----------------------------------------------------------------------------
+
+
+def _compact(value):
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, (int, str, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def latest_values(result):
+    """Last record of a list-of-records tool result, with compact values."""
+    if isinstance(result, list) and result and isinstance(result[-1], dict):
+        return {key: _compact(value) for key, value in result[-1].items()}
+    return {}
+
+
+def summarize_tool_result(name: str, args: dict, result, ref: str):
+    """
+    Short text describing a tool result stored in the artifact store: row count,
+    covered period and the latest values.
+    """
+    ticker = args.get("ticker", "")
+    if isinstance(result, list) and result and isinstance(result[0], dict):
+        first, last = result[0], result[-1]
+        date_key = next((key for key in ("Date", "Datetime") if key in last), None)
+        period = f" from {first[date_key]} to {last[date_key]}" if date_key else ""
+        return (
+            f"{name}({ticker}): {len(result)} rows{period}. "
+            f"Latest: {latest_values(result)} [ref: {ref}]"
+        )
+    text = str(result)
+    if len(text) > 500:
+        text = text[:500] + " …"
+    return f"{name}({ticker}): {text} [ref: {ref}]"
+
+
+def format_structured_results(state):
+    """Compact text of the rankings, indicator snapshots and sentiment in the state."""
+    lines = []
+    if state.get("rankings"):
+        lines.append("Fundamental ranking: " + ", ".join(
+            f"{row['Ticker']} ({row['Final_Score']:.3f})" for row in state["rankings"]
+        ))
+    for ticker, values in (state.get("indicators") or {}).items():
+        snapshot = {key: values.get(key) for key in ("Close", "MA_50", "MA_200", "RSI", "MACD", "Signal_Line", "%K")}
+        lines.append(f"Indicators {ticker}: {snapshot}")
+    sentiment = state.get("sentiment") or {}
+    if sentiment.get("top_gainers"):
+        lines.append("Top gainers: " + ", ".join(sentiment["top_gainers"]))
+    for article in sentiment.get("analyzed_news", []):
+        lines.append(f"News: {article['title']} -> {str(article['sentiment'])[:200]}")
+    return "\n".join(lines)